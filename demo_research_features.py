@@ -13,7 +13,19 @@ if "GROQ_API_KEY" not in os.environ:
     print("Example: export GROQ_API_KEY='your-key-here'")
     exit(1)
 
-from openai import OpenAI
+from scalable_agent.llm import get_groq_client, stream_completion
+
+def synthesize_failure_embeddings(rng: np.random.Generator, sizes, centers, sigmas, dim: int = 384) -> np.ndarray:
+    """
+    Generate clustered float32 embeddings into a single preallocated buffer.
+    Block i holds sizes[i] rows drawn from N(centers[i], sigmas[i]^2) in every dimension.
+    """
+    out = np.empty((int(np.sum(sizes)), dim), dtype=np.float32)
+    rng.standard_normal(out=out, dtype=np.float32)
+    out *= np.repeat(np.asarray(sigmas, dtype=np.float32), sizes)[:, None]
+    out += np.repeat(np.asarray(centers, dtype=np.float32), sizes)[:, None]
+    return out
+
 
 def demo_dbscan_clustering():
     """Demonstrate DBSCAN clustering on simulated failure embeddings."""
@@ -23,35 +35,36 @@ def demo_dbscan_clustering():
     
     # Simulated failure embeddings (384-dimensional, typical for sentence transformers)
     # Creating 3 clusters of similar failures
-    np.random.seed(42)
-    
-    # Cluster 1: API authentication failures (5 failures)
-    cluster1 = np.random.randn(5, 384) * 0.1 + np.array([1.0] * 384)
-    
-    # Cluster 2: SQL syntax errors (4 failures)
-    cluster2 = np.random.randn(4, 384) * 0.1 + np.array([-1.0] * 384)
-    
-    # Cluster 3: Python type errors (3 failures)
-    cluster3 = np.random.randn(3, 384) * 0.1 + np.array([0.5] * 384)
-    
-    # Noise (2 isolated failures)
-    noise = np.random.randn(2, 384) * 2.0
-    
-    # Combine all embeddings
-    all_embeddings = np.vstack([cluster1, cluster2, cluster3, noise])
+    rng = np.random.default_rng(42)
+
+    # Clusters: API authentication failures (5), SQL syntax errors (4),
+    # Python type errors (3), plus noise (2 isolated failures)
+    all_embeddings = synthesize_failure_embeddings(
+        rng,
+        sizes=[5, 4, 3, 2],
+        centers=[1.0, -1.0, 0.5, 0.0],
+        sigmas=[0.1, 0.1, 0.1, 2.0]
+    )
     
     print(f"Total failures: {len(all_embeddings)}")
     print(f"Expected clusters: 3")
     print(f"Expected noise points: 2")
     
+    # Cosine distances from L2-normalized vectors: a single matrix product
+    X = all_embeddings / np.linalg.norm(all_embeddings, axis=1, keepdims=True)
+    distances = 1.0 - X @ X.T
+    np.fill_diagonal(distances, 0.0)
+    np.maximum(distances, 0.0, out=distances)  # float32 rounding can dip below zero
+
     # Apply DBSCAN (as in paper: ε=0.3, minPts=2)
-    dbscan = DBSCAN(eps=0.3, min_samples=2, metric='cosine')
-    labels = dbscan.fit_predict(all_embeddings)
+    dbscan = DBSCAN(eps=0.3, min_samples=2, metric='precomputed')
+    labels = dbscan.fit_predict(distances)
     
-    # Count clusters
-    unique_labels = set(labels) - {-1}
-    n_clusters = len(unique_labels)
-    n_noise = list(labels).count(-1)
+    # Count clusters and noise in one pass
+    uniq, counts = np.unique(labels, return_counts=True)
+    is_cluster = uniq != -1
+    n_noise = int(counts[~is_cluster].sum())
+    n_clusters = int(is_cluster.sum())
     
     print(f"\n✓ DBSCAN Results:")
     print(f"  Clusters found: {n_clusters}")
@@ -59,8 +72,7 @@ def demo_dbscan_clustering():
     print(f"  Cluster labels: {labels}")
     
     # Show cluster sizes
-    for cluster_id in unique_labels:
-        size = list(labels).count(cluster_id)
+    for cluster_id, size in zip(uniq[is_cluster], counts[is_cluster]):
         print(f"  Cluster {cluster_id}: {size} failures")
     
     return labels
@@ -72,10 +84,7 @@ def demo_counterfactual_verification():
     print("DEMO 2: COUNTERFACTUAL VERIFICATION")
     print("="*70)
     
-    client = OpenAI(
-        api_key=os.getenv("GROQ_API_KEY"),
-        base_url="https://api.groq.com/openai/v1"
-    )
+    client = get_groq_client()
     
     # Example rule from clustering
     rule = "IF making API request THEN always include authentication headers BECAUSE unauthorized requests fail with 401 error"
@@ -96,13 +105,14 @@ The code should:
 Return ONLY the Python code, no markdown."""
     
     try:
-        response = client.chat.completions.create(
+        dream_code = stream_completion(
+            client,
             model="llama-3.3-70b-versatile",
             messages=[{"role": "user", "content": prompt}],
-            temperature=0.8
-        )
-        
-        dream_code = response.choices[0].message.content.strip()
+            temperature=0.8,
+            max_tokens=1024,
+            stop=["```\n\n"]
+        ).strip()
         dream_code = dream_code.replace("```python", "").replace("```", "").strip()
         
         print(f"\n✓ Generated Dream Scenario:")
@@ -5,10 +5,15 @@ Compares 4 system variants as described in the research paper.
 
 from .agent import LifelongAgent
 from .benchmarks.multi_domain import MultiDomainBenchmark
+from .benchmarks import configure_logging
 from .adapter import LifelongAgentAdapter
 from .evaluation.statistics import StatisticalEvaluator
+from concurrent.futures import ThreadPoolExecutor, as_completed
 import json
 
+MAX_CONCURRENT_VARIANTS = 8  # Bound in-flight variants to respect Groq rate limits
+RESULTS_FILE = "ablation_results.json"
+
 class AblationStudy:
     def __init__(self):
         self.variants = {
@@ -19,31 +24,28 @@ class AblationStudy:
         }
         self.results = {}
     
-    def run_variant(self, name: str, config: dict, num_tasks: int = 20) -> dict:
+    def run_variant(self, name: str, config: dict, tasks: list, benchmark: MultiDomainBenchmark) -> dict:
         """
-        Run a single variant on a subset of tasks.
+        Run a single variant on the given subset of benchmark tasks.
         """
         print(f"\n{'='*70}")
         print(f"Running Variant: {name}")
         print(f"Config: Sleep={config['sleep']}, Symbolic={config['symbolic']}")
         print(f"{'='*70}")
         
-        # Create agent with specific configuration
+        # Create agent with specific configuration.
+        # Each variant gets its own in-memory store so concurrent variants don't share memory.
         agent = LifelongAgent(
             enable_sleep=config['sleep'],
-            enable_symbolic=config['symbolic']
+            enable_symbolic=config['symbolic'],
+            persist_path=None
         )
         agent.store.clear()  # Start fresh
         
         # Create adapter
         adapter = LifelongAgentAdapter(agent=agent)
         
-        # Run on subset of benchmark
-        benchmark = MultiDomainBenchmark()
-        # Use first num_tasks for faster ablation
-        benchmark.tasks = benchmark.tasks[:num_tasks]
-        
-        results = benchmark.run_evaluation(adapter)
+        results = benchmark.run_evaluation(adapter, tasks=tasks, label=name)
         
         return {
             "name": name,
@@ -62,12 +64,23 @@ class AblationStudy:
         print("="*70)
         print(f"Testing {len(self.variants)} variants on {num_tasks} tasks each\n")
         
-        all_results = []
-        
-        for name, config in self.variants.items():
-            result = self.run_variant(name, config, num_tasks)
-            all_results.append(result)
-            self.results[name] = result
+        # Build the benchmark once; use the first num_tasks for faster ablation
+        benchmark = MultiDomainBenchmark()
+        tasks = list(benchmark.tasks[:num_tasks])
+        
+        # Variants are independent, so overlap their LLM round-trips
+        with ThreadPoolExecutor(max_workers=min(len(self.variants), MAX_CONCURRENT_VARIANTS)) as pool:
+            futures = [pool.submit(self.run_variant, name, config, tasks, benchmark)
+                       for name, config in self.variants.items()]
+            for future in as_completed(futures):
+                result = future.result()
+                self.results[result['name']] = result
+                # Persist after every variant so a crash keeps the finished ones
+                self._save_results()
+        
+        # Restore the declared variant order
+        all_results = [self.results[name] for name in self.variants]
+        self.results = {r['name']: r for r in all_results}
         
         # Print comparison table
         self._print_comparison_table(all_results)
@@ -76,13 +89,17 @@ class AblationStudy:
         self._statistical_analysis(all_results)
         
         # Save results
-        with open("ablation_results.json", "w") as f:
-            json.dump(self.results, f, indent=2)
+        self._save_results()
         
-        print(f"\n✓ Ablation study complete. Results saved to ablation_results.json")
+        print(f"\n✓ Ablation study complete. Results saved to {RESULTS_FILE}")
         
         return self.results
     
+    def _save_results(self):
+        """Write the results gathered so far."""
+        with open(RESULTS_FILE, "w") as f:
+            json.dump(self.results, f, indent=2)
+    
     def _print_comparison_table(self, results: list):
         """Print formatted comparison table."""
         print("\n" + "="*70)
@@ -91,13 +108,12 @@ class AblationStudy:
         print(f"{'Variant':<25} {'Success Rate':<15} {'vs Baseline':<15}")
         print("-"*70)
         
-        baseline_rate = next(r['success_rate'] for r in results if r['name'] == "No Memory")
+        by_name = {r['name']: r for r in results}
+        baseline_rate = by_name["No Memory"]['success_rate']
         
         for r in results:
             rate = r['success_rate']
-            diff = rate - baseline_rate
-            diff_str = f"+{diff:.1f}%" if diff > 0 else f"{diff:.1f}%"
-            print(f"{r['name']:<25} {rate:>6.1f}%{'':<8} {diff_str:<15}")
+            print(f"{r['name']:<25} {rate:>6.1f}%{'':<8} {_format_diff(rate - baseline_rate):<15}")
         
         print("="*70)
     
@@ -109,8 +125,9 @@ class AblationStudy:
         
         # For demonstration, we'll show the improvement
         # In a real study, you'd run multiple trials and use actual t-tests
-        full_system = next(r for r in results if r['name'] == "Full System (ADM)")
-        no_memory = next(r for r in results if r['name'] == "No Memory")
+        by_name = {r['name']: r for r in results}
+        full_system = by_name["Full System (ADM)"]
+        no_memory = by_name["No Memory"]
         
         improvement = full_system['success_rate'] - no_memory['success_rate']
         
@@ -121,6 +138,11 @@ class AblationStudy:
         print("="*70)
 
 
+def _format_diff(diff: float) -> str:
+    """Signed percentage-point difference, e.g. '+12.5%'."""
+    return f"+{diff:.1f}%" if diff > 0 else f"{diff:.1f}%"
+
+
 def run_quick_ablation():
     """Quick ablation on 10 tasks per variant."""
     study = AblationStudy()
@@ -138,6 +160,8 @@ def run_full_ablation():
 if __name__ == "__main__":
     import sys
     
+    configure_logging()
+    
     if len(sys.argv) > 1 and sys.argv[1] == "--full":
         print("Running FULL ablation study (30 tasks per variant)...")
         run_full_ablation()
@@ -1,11 +1,15 @@
+from typing import Any, Callable, Optional
 from .agent import LifelongAgent
 
 class LifelongAgentAdapter:
     """
     Adapter to make LifelongAgent compatible with standard benchmark interfaces.
     """
-    def __init__(self):
-        self.agent = LifelongAgent(enable_sleep=True, enable_symbolic=True)
+    def __init__(self, agent: Optional[LifelongAgent] = None):
+        # Wrap a pre-configured agent (e.g. an ablation variant) or build the full system
+        self.agent = agent or LifelongAgent(enable_sleep=True, enable_symbolic=True)
+        # Code returned cut short by `until`; never stored as a learned success
+        self._truncated_code: Optional[str] = None
         
     def reset(self):
         """
@@ -14,9 +18,12 @@ class LifelongAgentAdapter:
         # In a real benchmark, we might clear context window here.
         pass
         
-    def step(self, observation: str) -> str:
+    def step(self, observation: str, until: Optional[Callable[[str], Any]] = None) -> str:
         """
         Receives an observation (task) and returns an action (code).
+        If `until` is given, generation stops once until(code_so_far) is truthy,
+        e.g. as soon as the benchmark's success pattern has matched; such a prefix
+        is not stored in memory by learn().
         """
         # For the benchmark, we want to return the GENERATED CODE, not execute it immediately
         # (The benchmark harness usually handles execution).
@@ -25,10 +32,17 @@ class LifelongAgentAdapter:
         context = self.agent.retriever.retrieve_context(observation)
         
         # 2. Generate
-        code = self.agent._generate_code(observation, context)
+        code, stopped_early = self.agent._generate_code_until(observation, context, until)
+        self._truncated_code = code if stopped_early else None
         
         return code
 
+    def embed_cache_info(self):
+        """
+        Hits/misses of the memory's query-embedding cache (see VectorStore.embed).
+        """
+        return self.agent.store.embed_cache_info()
+
     def learn(self, task: str, code: str, result: str, success: bool):
         """
         Explicit feedback channel for the benchmark to tell the agent the result.
@@ -45,6 +59,9 @@ class LifelongAgentAdapter:
                 }
             )
             self.agent.sleep() # Consolidate
+        elif code == self._truncated_code:
+            # Only a prefix of the generation: storing it would pollute later retrievals
+            print("[Adapter] Early-stopped generation; not stored as an episode")
         else:
             self.agent.store.add_episode(
                 text=f"Task: {task}\nCode: {code}",
@@ -1,26 +1,23 @@
-import os
-from openai import OpenAI
-from .memory.vector_store import VectorStore
+from .llm import get_groq_client, stream_completion_until, completion_cache_key, cache_get, cache_set
+from typing import Any, Callable, Optional, Tuple
+from .memory.vector_store import VectorStore, InMemoryVectorStore
 from .memory.retrieval import HybridRetriever
 from .core.executor import Executor
 from .core.reflector import Reflector
 from .core.dreamer import Dreamer
 
 class LifelongAgent:
-    def __init__(self, enable_sleep: bool = True, enable_symbolic: bool = True):
-        # Initialize API Client (Groq)
-        api_key = os.getenv("GROQ_API_KEY", "your-api-key-here")
-        self.client = OpenAI(
-            api_key=api_key,
-            base_url="https://api.groq.com/openai/v1"
-        )
+    def __init__(self, enable_sleep: bool = True, enable_symbolic: bool = True, persist_path: Optional[str] = "chroma_db"):
+        # Initialize API Client (Groq), shared across agent instances
+        self.client = get_groq_client()
         self.model = "llama-3.3-70b-versatile"
         
         self.enable_sleep = enable_sleep
         self.enable_symbolic = enable_symbolic
 
         # Initialize Components
-        self.store = VectorStore(persist_path="chroma_db")
+        # persist_path=None keeps memory in-process (nothing written to disk)
+        self.store = VectorStore(persist_path=persist_path) if persist_path else InMemoryVectorStore()
         self.retriever = HybridRetriever(self.store)
         self.executor = Executor()
         self.reflector = Reflector(self.client, self.model)
@@ -84,24 +81,51 @@ class LifelongAgent:
         """
         Triggers the consolidation process.
         """
+        self.store.flush()  # Embed any buffered episodes before dreaming over them
         self.dreamer.dream()
 
     def _generate_code(self, task: str, context: str) -> str:
+        """
+        Generates code for `task`.
+        """
+        code, _ = self._generate_code_until(task, context, None)
+        return code
+
+    def _generate_code_until(self, task: str, context: str,
+                             until: Optional[Callable[[str], Any]]) -> Tuple[str, bool]:
+        """
+        Like _generate_code, but generation stops as soon as until(code_so_far) is
+        truthy (see stream_completion_until). Returns (code, stopped_early).
+        """
         system_prompt = "You are a Python coding agent. Write a COMPLETE, RUNNABLE Python script. Print the final result. Do not use markdown blocks."
         user_prompt = f"Task: {task}\n\nContext: {context}\n\nWrite the code:"
+        max_tokens = 1024
+        stop = ["```\n\n"]  # Stop at a closing fence so markdown trailers aren't generated
+        
+        # Generation is deterministic (temperature 0), so it is reused across runs and ablation variants
+        cache_key = completion_cache_key(self.model, system_prompt, user_prompt, max_tokens, stop)
+        cached = cache_get(cache_key)
+        if cached is not None:
+            return cached, False
         
         try:
-            response = self.client.chat.completions.create(
+            code, stopped_early = stream_completion_until(
+                self.client,
                 model=self.model,
                 messages=[
                     {"role": "system", "content": system_prompt},
                     {"role": "user", "content": user_prompt}
                 ],
-                temperature=0
+                temperature=0,
+                until=until,
+                max_tokens=max_tokens,
+                stop=stop
             )
-            code = response.choices[0].message.content
             code = code.replace("```python", "").replace("```", "").strip()
-            return code
+            # Only complete generations are worth reusing
+            if not stopped_early:
+                cache_set(cache_key, code)
+            return code, stopped_early
         except Exception as e:
             print(f"[Agent] Generation Error: {e}")
-            return "print('Error')"
+            return "print('Error')", False
@@ -7,17 +7,28 @@ This module implements three baseline agents:
 3. ADM (Full): Our proposed Active Dreaming Memory system
 """
 
-from openai import OpenAI
+import heapq
 import json
-import os
-from typing import List, Dict, Optional
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import List, Dict, Optional, Set
+from .llm import get_groq_client
+
+MAX_WORKERS = 16  # Concurrent baseline tasks; each is dominated by an LLM round-trip
+
+
+@lru_cache(maxsize=1024)
+def _compile_code(source: str):
+    """Compile generated code once; identical sources reuse the bytecode."""
+    return compile(source, "<generated>", "exec")
+
 
 class NoMemoryAgent:
     """Baseline 1: Standard LLM without memory (stateless)"""
     
     def __init__(self):
-        api_key = os.getenv("GROQ_API_KEY", "your-api-key-here")
-        self.client = OpenAI(api_key=api_key, base_url="https://api.groq.com/openai/v1")
+        self.client = get_groq_client()
         self.model = "llama-3.3-70b-versatile"
         
     def run_task(self, task: str) -> bool:
@@ -35,7 +46,7 @@ class NoMemoryAgent:
             
             # Execute code (simplified)
             exec_globals = {}
-            exec(code, exec_globals)
+            exec(_compile_code(code), exec_globals)
             return True
         except Exception as e:
             print(f"[NoMemory] Failed: {e}")
@@ -46,10 +57,10 @@ class RAGOnlyAgent:
     """Baseline 2: RAG without consolidation (stores raw episodes)"""
     
     def __init__(self):
-        api_key = os.getenv("GROQ_API_KEY", "your-api-key-here")
-        self.client = OpenAI(api_key=api_key, base_url="https://api.groq.com/openai/v1")
+        self.client = get_groq_client()
         self.model = "llama-3.3-70b-versatile"
         self.memory = []  # Simple list of past experiences
+        self.index: Dict[str, Set[int]] = defaultdict(set)  # Task word -> memory indices
         
     def run_task(self, task: str) -> bool:
         """Execute task with simple RAG (no consolidation)"""
@@ -72,10 +83,10 @@ class RAGOnlyAgent:
             
             # Execute
             exec_globals = {}
-            exec(code, exec_globals)
+            exec(_compile_code(code), exec_globals)
             
             # Store raw experience
-            self.memory.append({
+            self._remember({
                 "task": task,
                 "code": code,
                 "success": True
@@ -84,7 +95,7 @@ class RAGOnlyAgent:
             
         except Exception as e:
             # Store failure
-            self.memory.append({
+            self._remember({
                 "task": task,
                 "error": str(e),
                 "success": False
@@ -92,19 +103,47 @@ class RAGOnlyAgent:
             print(f"[RAG] Failed: {e}")
             return False
     
+    def _remember(self, entry: Dict):
+        """Append an experience and index it by the words of its task."""
+        idx = len(self.memory)
+        self.memory.append(entry)
+        for word in entry.get("task", "").lower().split():
+            self.index[word].add(idx)
+    
     def _retrieve_context(self, task: str) -> str:
         """Simple keyword-based retrieval"""
-        relevant = [m for m in self.memory if any(word in task.lower() for word in m.get("task", "").lower().split())]
+        candidates = set().union(*(self.index.get(word, ()) for word in task.lower().split()))
+        relevant = [self.memory[i] for i in heapq.nsmallest(3, candidates)]  # Oldest first, as before
         return "\n".join([f"- {m.get('task', 'N/A')}: {'Success' if m.get('success') else m.get('error', 'Failed')}" 
-                         for m in relevant[:3]])
+                         for m in relevant])
+
 
+def _run_baseline_tasks(agent, tasks: List[Dict], concurrent: bool = False) -> int:
+    """
+    Run the tasks and count successes.
+    concurrent=True runs them on a thread pool (they are network-bound); only
+    safe for stateless agents, since tasks would not see each other's results.
+    """
+    prompts = [t['prompt'] for t in tasks]
+    if not concurrent or not prompts:
+        return sum(agent.run_task(prompt) for prompt in prompts)
+    with ThreadPoolExecutor(max_workers=min(MAX_WORKERS, len(tasks))) as pool:
+        results = list(pool.map(agent.run_task, prompts))
+    return sum(results)
 
-def run_comparative_benchmark():
-    """Run all three agents on the same benchmark"""
+
+def _save_results(results: Dict[str, float], output_file: str):
+    with open(output_file, "w") as f:
+        json.dump(results, f, indent=2)
+
+
+def run_comparative_benchmark(output_file: str = "baseline_results.json"):
+    """Run all three agents on the same benchmark; results are saved after each agent"""
     from scalable_agent.mock_benchmark import MockBenchmark
     from scalable_agent.adapter import LifelongAgentAdapter
     
     results = {}
+    bench = MockBenchmark()  # Shared by all three agents
     
     print("\n" + "="*60)
     print("COMPARATIVE BENCHMARK EVALUATION")
@@ -113,32 +152,27 @@ def run_comparative_benchmark():
     # Baseline 1: No Memory
     print("\n[1/3] Running No Memory Agent...")
     no_mem = NoMemoryAgent()
-    bench1 = MockBenchmark()
     # Note: MockBenchmark expects an adapter, so we'll run simplified version
-    success_count = 0
-    for task in bench1.tasks:
-        if no_mem.run_task(task['prompt']):
-            success_count += 1
-    results['No Memory'] = success_count / len(bench1.tasks)
+    success_count = _run_baseline_tasks(no_mem, bench.tasks, concurrent=True)
+    results['No Memory'] = success_count / len(bench.tasks)
     print(f"Result: {results['No Memory']*100:.1f}%")
+    _save_results(results, output_file)
     
     # Baseline 2: RAG Only
     print("\n[2/3] Running RAG-Only Agent...")
     rag = RAGOnlyAgent()
-    bench2 = MockBenchmark()
-    success_count = 0
-    for task in bench2.tasks:
-        if rag.run_task(task['prompt']):
-            success_count += 1
-    results['RAG Only'] = success_count / len(bench2.tasks)
+    # Sequential: each task must be able to retrieve the ones before it
+    success_count = _run_baseline_tasks(rag, bench.tasks)
+    results['RAG Only'] = success_count / len(bench.tasks)
     print(f"Result: {results['RAG Only']*100:.1f}%")
+    _save_results(results, output_file)
     
     # Our System: ADM
     print("\n[3/3] Running ADM (Full System)...")
     adapter = LifelongAgentAdapter()
-    bench3 = MockBenchmark()
-    result = bench3.run_evaluation(adapter)
+    result = bench.run_evaluation(adapter)
     results['ADM (Ours)'] = result['success_rate']
+    _save_results(results, output_file)
     
     # Print comparison table
     print("\n" + "="*60)
@@ -157,8 +191,4 @@ def run_comparative_benchmark():
 
 if __name__ == "__main__":
     results = run_comparative_benchmark()
-    
-    # Save results
-    with open("baseline_results.json", "w") as f:
-        json.dump(results, f, indent=2)
     print("\nResults saved to baseline_results.json")
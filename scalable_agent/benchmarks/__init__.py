@@ -5,321 +5,440 @@ Implements the 60-task evaluation described in the research paper.
 Domains: SQL, Python, API, Dialogue, Navigation, STEM (10 tasks each)
 """
 
+import logging
 import re
-from typing import List, Dict, Tuple
-from ..adapter import LifelongAgentAdapter
+import sys
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, List, Dict, Tuple, Optional
 
-class MultiDomainBenchmark:
-    def __init__(self):
-        self.tasks = self._create_tasks()
+if TYPE_CHECKING:
+    from ..adapter import LifelongAgentAdapter
+
+try:
+    import re2 as _regex  # google-re2: linear-time matching, no catastrophic backtracking
+except ImportError:
+    _regex = re
+
+PATTERN_FLAGS = re.IGNORECASE | re.DOTALL
+INLINE_FLAGS = "(?is)"  # PATTERN_FLAGS spelled inline, which both re and re2 accept
+MIN_LITERAL_LEN = 3
+
+# Per-task progress goes through a module logger whose output is configured by the
+# application (see configure_logging); headers and the results table are printed
+log = logging.getLogger(__name__)
+log.addHandler(logging.NullHandler())
+_STDOUT_HANDLER_NAME = "benchmark-stdout"
+
+
+def configure_logging(level: int = logging.INFO):
+    """
+    Writes per-task benchmark progress to stdout. Safe to call more than once.
+    Raise `level` to WARNING to silence it entirely.
+    """
+    if not any(handler.get_name() == _STDOUT_HANDLER_NAME for handler in log.handlers):
+        stream_handler = logging.StreamHandler(sys.stdout)
+        stream_handler.set_name(_STDOUT_HANDLER_NAME)
+        stream_handler.setFormatter(logging.Formatter("%(message)s"))
+        log.addHandler(stream_handler)
+    log.setLevel(level)
+    log.propagate = False
+
+
+def _required_literal(pattern: str) -> Optional[str]:
+    """
+    Longest literal word every match of `pattern` must contain, case-folded.
+    Returns None when there is none of MIN_LITERAL_LEN chars, or when the pattern
+    uses alternation/groups and no single literal is guaranteed.
+    Counted quantifiers ({m,n}) are skipped whole, never read as literal text.
     
-    def _create_tasks(self) -> List[Dict]:
-        """Create 60 tasks across 6 domains (10 per domain)."""
-        tasks = []
-        
-        # SQL Domain (10 tasks)
-        sql_tasks = [
-            {
-                "id": "sql_1",
-                "domain": "SQL",
-                "prompt": "Write a SQL query to select all users from 'users' table where age > 30",
-                "expected_patterns": [r"SELECT.*FROM\s+users.*WHERE.*age\s*>\s*30"],
-                "difficulty": "easy"
-            },
-            {
-                "id": "sql_2",
-                "domain": "SQL",
-                "prompt": "Write a SQL query with INNER JOIN to get orders with customer names from 'orders' and 'customers' tables",
-                "expected_patterns": [r"INNER\s+JOIN", r"JOIN.*customers", r"orders.*customers"],
-                "difficulty": "medium"
-            },
-            {
-                "id": "sql_3",
-                "domain": "SQL",
-                "prompt": "Write a SQL query to handle NULL values using IS NULL operator in 'products' table",
-                "expected_patterns": [r"IS\s+NULL", r"IS\s+NOT\s+NULL"],
-                "difficulty": "medium"
-            },
-            {
-                "id": "sql_4",
-                "domain": "SQL",
-                "prompt": "Write a SQL query with GROUP BY and COUNT to count users per city",
-                "expected_patterns": [r"GROUP\s+BY", r"COUNT\("],
-                "difficulty": "medium"
-            },
-            {
-                "id": "sql_5",
-                "domain": "SQL",
-                "prompt": "Write a SQL query with LEFT JOIN to include all customers even without orders",
-                "expected_patterns": [r"LEFT\s+JOIN", r"LEFT\s+OUTER\s+JOIN"],
-                "difficulty": "medium"
-            },
-            {
-                "id": "sql_6",
-                "domain": "SQL",
-                "prompt": "Write a SQL query with HAVING clause to filter groups with count > 5",
-                "expected_patterns": [r"HAVING", r"COUNT.*>\s*5"],
-                "difficulty": "hard"
-            },
-            {
-                "id": "sql_7",
-                "domain": "SQL",
-                "prompt": "Write a SQL query with subquery to find users with above-average salary",
-                "expected_patterns": [r"SELECT.*FROM.*WHERE.*>\s*\(SELECT\s+AVG"],
-                "difficulty": "hard"
-            },
-            {
-                "id": "sql_8",
-                "domain": "SQL",
-                "prompt": "Write a SQL query with UNION to combine results from two tables",
-                "expected_patterns": [r"UNION"],
-                "difficulty": "medium"
-            },
-            {
-                "id": "sql_9",
-                "domain": "SQL",
-                "prompt": "Write a SQL query with CASE statement for conditional logic",
-                "expected_patterns": [r"CASE\s+WHEN", r"CASE.*WHEN.*THEN"],
-                "difficulty": "hard"
-            },
-            {
-                "id": "sql_10",
-                "domain": "SQL",
-                "prompt": "Write a SQL query with window function ROW_NUMBER() OVER",
-                "expected_patterns": [r"ROW_NUMBER\(\)", r"OVER\s*\("],
-                "difficulty": "hard"
-            }
-        ]
-        
-        # Python Domain (10 tasks)
-        python_tasks = [
-            {
-                "id": "python_1",
-                "domain": "Python",
-                "prompt": "Write a Python function 'factorial' to calculate factorial of a number",
-                "expected_patterns": [r"def\s+factorial", r"factorial\s*=\s*lambda"],
-                "difficulty": "easy"
-            },
-            {
-                "id": "python_2",
-                "domain": "Python",
-                "prompt": "Write a Python function to reverse a string",
-                "expected_patterns": [r"def.*reverse", r"\[::-1\]", r"reversed\("],
-                "difficulty": "easy"
-            },
-            {
-                "id": "python_3",
-                "domain": "Python",
-                "prompt": "Write a Python function to check if a number is prime",
-                "expected_patterns": [r"def.*prime", r"for.*in\s+range", r"%\s*==\s*0"],
-                "difficulty": "medium"
-            },
-            {
-                "id": "python_4",
-                "domain": "Python",
-                "prompt": "Write a Python function to implement binary search on a sorted list",
-                "expected_patterns": [r"def.*binary", r"while.*left.*right", r"mid\s*="],
-                "difficulty": "medium"
-            },
-            {
-                "id": "python_5",
-                "domain": "Python",
-                "prompt": "Write a Python function to merge two sorted lists",
-                "expected_patterns": [r"def.*merge", r"while.*and", r"append"],
-                "difficulty": "medium"
-            },
-            {
-                "id": "python_6",
-                "domain": "Python",
-                "prompt": "Write a Python function with try-except to handle KeyError when accessing dictionary",
-                "expected_patterns": [r"try:", r"except\s+KeyError", r"\.get\("],
-                "difficulty": "medium"
-            },
-            {
-                "id": "python_7",
-                "domain": "Python",
-                "prompt": "Write a Python class with __init__ and __str__ methods",
-                "expected_patterns": [r"class\s+\w+", r"def\s+__init__", r"def\s+__str__"],
-                "difficulty": "medium"
-            },
-            {
-                "id": "python_8",
-                "domain": "Python",
-                "prompt": "Write a Python generator function using yield",
-                "expected_patterns": [r"def\s+\w+", r"yield"],
-                "difficulty": "hard"
-            },
-            {
-                "id": "python_9",
-                "domain": "Python",
-                "prompt": "Write a Python decorator function",
-                "expected_patterns": [r"def\s+\w+\(func\)", r"def\s+wrapper", r"return\s+wrapper"],
-                "difficulty": "hard"
-            },
-            {
-                "id": "python_10",
-                "domain": "Python",
-                "prompt": "Write a Python function using list comprehension with conditional",
-                "expected_patterns": [r"\[.*for.*in.*if.*\]"],
-                "difficulty": "medium"
-            }
-        ]
-        
-        # API Domain (10 tasks)
-        api_tasks = [
-            {
-                "id": "api_1",
-                "domain": "API",
-                "prompt": "Write Python code to make a GET request using requests library",
-                "expected_patterns": [r"import\s+requests", r"requests\.get\("],
-                "difficulty": "easy"
-            },
-            {
-                "id": "api_2",
-                "domain": "API",
-                "prompt": "Write Python code to make a POST request with JSON data",
-                "expected_patterns": [r"requests\.post\(", r"json\s*=", r"headers"],
-                "difficulty": "medium"
-            },
-            {
-                "id": "api_3",
-                "domain": "API",
-                "prompt": "Write Python code to handle HTTP authentication with headers",
-                "expected_patterns": [r"headers\s*=", r"Authorization", r"Bearer|Token"],
-                "difficulty": "medium"
-            },
-            {
-                "id": "api_4",
-                "domain": "API",
-                "prompt": "Write Python code with try-except to handle requests.exceptions.RequestException",
-                "expected_patterns": [r"try:", r"except.*RequestException", r"requests\."],
-                "difficulty": "medium"
-            },
-            {
-                "id": "api_5",
-                "domain": "API",
-                "prompt": "Write Python code to check response.status_code before processing",
-                "expected_patterns": [r"status_code", r"==\s*200", r"if.*status"],
-                "difficulty": "easy"
-            },
-            {
-                "id": "api_6",
-                "domain": "API",
-                "prompt": "Write Python code to parse JSON response with response.json()",
-                "expected_patterns": [r"\.json\(\)", r"response\.json"],
-                "difficulty": "easy"
-            },
-            {
-                "id": "api_7",
-                "domain": "API",
-                "prompt": "Write Python code to handle API rate limiting with retry logic",
-                "expected_patterns": [r"while|for.*range", r"sleep\(", r"retry|attempt"],
-                "difficulty": "hard"
-            },
-            {
-                "id": "api_8",
-                "domain": "API",
-                "prompt": "Write Python code to make API request with query parameters",
-                "expected_patterns": [r"params\s*=", r"requests\.get.*params"],
-                "difficulty": "medium"
-            },
-            {
-                "id": "api_9",
-                "domain": "API",
-                "prompt": "Write Python code to handle timeout in API requests",
-                "expected_patterns": [r"timeout\s*=", r"requests\..*timeout"],
-                "difficulty": "medium"
-            },
-            {
-                "id": "api_10",
-                "domain": "API",
-                "prompt": "Write Python code to upload file using requests with files parameter",
-                "expected_patterns": [r"files\s*=", r"open\(.*'rb'\)", r"requests\.post.*files"],
-                "difficulty": "hard"
-            }
-        ]
-        
-        # Simplified Dialogue, Navigation, STEM tasks
-        dialogue_tasks = [{"id": f"dialogue_{i+1}", "domain": "Dialogue", "prompt": f"Write a chatbot response for: {topic}", "expected_patterns": [r"def|class|response"], "difficulty": "medium"} 
-                          for i, topic in enumerate(["greeting", "help request", "complaint", "question", "farewell", "confusion", "thanks", "apology", "feedback", "escalation"])]
-        
-        navigation_tasks = [{"id": f"nav_{i+1}", "domain": "Navigation", "prompt": f"Write pathfinding code for: {scenario}", "expected_patterns": [r"def|class|path|move"], "difficulty": "medium"}
-                           for i, scenario in enumerate(["grid navigation", "obstacle avoidance", "shortest path", "A* algorithm", "BFS", "DFS", "dijkstra", "maze solving", "waypoint following", "collision detection"])]
-        
-        stem_tasks = [{"id": f"stem_{i+1}", "domain": "STEM", "prompt": f"Write code to solve: {problem}", "expected_patterns": [r"def|class|\*\*|math"], "difficulty": "hard"}
-                     for i, problem in enumerate(["quadratic equation", "physics kinematics", "statistics mean/std", "matrix multiplication", "derivative calculation", "integral approximation", "probability calculation", "combinatorics", "geometry area", "trigonometry"])]
-        
-        tasks.extend(sql_tasks)
-        tasks.extend(python_tasks)
-        tasks.extend(api_tasks)
-        tasks.extend(dialogue_tasks)
-        tasks.extend(navigation_tasks)
-        tasks.extend(stem_tasks)
-        
-        return tasks
+    >>> _required_literal(r"def\s+factorial")
+    'factorial'
+    >>> _required_literal(r"x{3,5}\d{100}") is None
+    True
+    >>> _required_literal(r"SELECT\s+\w{2,}\s+FROM")
+    'select'
+    """
+    best, run, i = "", "", 0
+    while i < len(pattern):
+        ch = pattern[i]
+        if ch.isalnum() or ch == "_":
+            run += ch
+            i += 1
+            continue
+        if ch in "|()":
+            return None
+        # A quantifier that allows zero repeats makes the previous char optional
+        best = max(best, run[:-1] if ch in "?*{" else run, key=len)
+        run = ""
+        if ch == "\\":
+            i += 2  # Escapes (\s, \(, ...) are never part of a literal
+        elif ch == "[":
+            end = pattern.find("]", i + 2)
+            i = end + 1 if end != -1 else len(pattern)
+        elif ch == "{" and re.match(r"\{\d*(,\d*)?\}", pattern[i:]):
+            i = pattern.index("}", i) + 1
+        else:
+            i += 1
+    best = max(best, run, key=len)
+    return best.casefold() if len(best) >= MIN_LITERAL_LEN else None
+
+
+@dataclass(frozen=True, slots=True)
+class Task:
+    id: str
+    domain: str
+    prompt: str
+    expected_patterns: Tuple[re.Pattern, ...]
+    prefilters: Tuple[Optional[str], ...]  # Literal each pattern requires, see _required_literal
+    combined_re: Any  # All expected patterns as one alternation, compiled with _regex
+    difficulty: str = "medium"
+
+
+def _create_tasks() -> Tuple[Task, ...]:
+    """Create 60 tasks across 6 domains (10 per domain)."""
+    tasks = []
     
-    def run_evaluation(self, agent: LifelongAgentAdapter) -> Dict:
+    # SQL Domain (10 tasks)
+    sql_tasks = [
+        {
+            "id": "sql_1",
+            "domain": "SQL",
+            "prompt": "Write a SQL query to select all users from 'users' table where age > 30",
+            "expected_patterns": [r"SELECT.*FROM\s+users.*WHERE.*age\s*>\s*30"],
+            "difficulty": "easy"
+        },
+        {
+            "id": "sql_2",
+            "domain": "SQL",
+            "prompt": "Write a SQL query with INNER JOIN to get orders with customer names from 'orders' and 'customers' tables",
+            "expected_patterns": [r"INNER\s+JOIN", r"JOIN.*customers", r"orders.*customers"],
+            "difficulty": "medium"
+        },
+        {
+            "id": "sql_3",
+            "domain": "SQL",
+            "prompt": "Write a SQL query to handle NULL values using IS NULL operator in 'products' table",
+            "expected_patterns": [r"IS\s+NULL", r"IS\s+NOT\s+NULL"],
+            "difficulty": "medium"
+        },
+        {
+            "id": "sql_4",
+            "domain": "SQL",
+            "prompt": "Write a SQL query with GROUP BY and COUNT to count users per city",
+            "expected_patterns": [r"GROUP\s+BY", r"COUNT\("],
+            "difficulty": "medium"
+        },
+        {
+            "id": "sql_5",
+            "domain": "SQL",
+            "prompt": "Write a SQL query with LEFT JOIN to include all customers even without orders",
+            "expected_patterns": [r"LEFT\s+JOIN", r"LEFT\s+OUTER\s+JOIN"],
+            "difficulty": "medium"
+        },
+        {
+            "id": "sql_6",
+            "domain": "SQL",
+            "prompt": "Write a SQL query with HAVING clause to filter groups with count > 5",
+            "expected_patterns": [r"HAVING", r"COUNT.*>\s*5"],
+            "difficulty": "hard"
+        },
+        {
+            "id": "sql_7",
+            "domain": "SQL",
+            "prompt": "Write a SQL query with subquery to find users with above-average salary",
+            "expected_patterns": [r"SELECT.*FROM.*WHERE.*>\s*\(SELECT\s+AVG"],
+            "difficulty": "hard"
+        },
+        {
+            "id": "sql_8",
+            "domain": "SQL",
+            "prompt": "Write a SQL query with UNION to combine results from two tables",
+            "expected_patterns": [r"UNION"],
+            "difficulty": "medium"
+        },
+        {
+            "id": "sql_9",
+            "domain": "SQL",
+            "prompt": "Write a SQL query with CASE statement for conditional logic",
+            "expected_patterns": [r"CASE\s+WHEN", r"CASE.*WHEN.*THEN"],
+            "difficulty": "hard"
+        },
+        {
+            "id": "sql_10",
+            "domain": "SQL",
+            "prompt": "Write a SQL query with window function ROW_NUMBER() OVER",
+            "expected_patterns": [r"ROW_NUMBER\(\)", r"OVER\s*\("],
+            "difficulty": "hard"
+        }
+    ]
+    
+    # Python Domain (10 tasks)
+    python_tasks = [
+        {
+            "id": "python_1",
+            "domain": "Python",
+            "prompt": "Write a Python function 'factorial' to calculate factorial of a number",
+            "expected_patterns": [r"def\s+factorial", r"factorial\s*=\s*lambda"],
+            "difficulty": "easy"
+        },
+        {
+            "id": "python_2",
+            "domain": "Python",
+            "prompt": "Write a Python function to reverse a string",
+            "expected_patterns": [r"def.*reverse", r"\[::-1\]", r"reversed\("],
+            "difficulty": "easy"
+        },
+        {
+            "id": "python_3",
+            "domain": "Python",
+            "prompt": "Write a Python function to check if a number is prime",
+            "expected_patterns": [r"def.*prime", r"for.*in\s+range", r"%\s*==\s*0"],
+            "difficulty": "medium"
+        },
+        {
+            "id": "python_4",
+            "domain": "Python",
+            "prompt": "Write a Python function to implement binary search on a sorted list",
+            "expected_patterns": [r"def.*binary", r"while.*left.*right", r"mid\s*="],
+            "difficulty": "medium"
+        },
+        {
+            "id": "python_5",
+            "domain": "Python",
+            "prompt": "Write a Python function to merge two sorted lists",
+            "expected_patterns": [r"def.*merge", r"while.*and", r"append"],
+            "difficulty": "medium"
+        },
+        {
+            "id": "python_6",
+            "domain": "Python",
+            "prompt": "Write a Python function with try-except to handle KeyError when accessing dictionary",
+            "expected_patterns": [r"try:", r"except\s+KeyError", r"\.get\("],
+            "difficulty": "medium"
+        },
+        {
+            "id": "python_7",
+            "domain": "Python",
+            "prompt": "Write a Python class with __init__ and __str__ methods",
+            "expected_patterns": [r"class\s+\w+", r"def\s+__init__", r"def\s+__str__"],
+            "difficulty": "medium"
+        },
+        {
+            "id": "python_8",
+            "domain": "Python",
+            "prompt": "Write a Python generator function using yield",
+            "expected_patterns": [r"def\s+\w+", r"yield"],
+            "difficulty": "hard"
+        },
+        {
+            "id": "python_9",
+            "domain": "Python",
+            "prompt": "Write a Python decorator function",
+            "expected_patterns": [r"def\s+\w+\(func\)", r"def\s+wrapper", r"return\s+wrapper"],
+            "difficulty": "hard"
+        },
+        {
+            "id": "python_10",
+            "domain": "Python",
+            "prompt": "Write a Python function using list comprehension with conditional",
+            "expected_patterns": [r"\[.*for.*in.*if.*\]"],
+            "difficulty": "medium"
+        }
+    ]
+    
+    # API Domain (10 tasks)
+    api_tasks = [
+        {
+            "id": "api_1",
+            "domain": "API",
+            "prompt": "Write Python code to make a GET request using requests library",
+            "expected_patterns": [r"import\s+requests", r"requests\.get\("],
+            "difficulty": "easy"
+        },
+        {
+            "id": "api_2",
+            "domain": "API",
+            "prompt": "Write Python code to make a POST request with JSON data",
+            "expected_patterns": [r"requests\.post\(", r"json\s*=", r"headers"],
+            "difficulty": "medium"
+        },
+        {
+            "id": "api_3",
+            "domain": "API",
+            "prompt": "Write Python code to handle HTTP authentication with headers",
+            "expected_patterns": [r"headers\s*=", r"Authorization", r"Bearer|Token"],
+            "difficulty": "medium"
+        },
+        {
+            "id": "api_4",
+            "domain": "API",
+            "prompt": "Write Python code with try-except to handle requests.exceptions.RequestException",
+            "expected_patterns": [r"try:", r"except.*RequestException", r"requests\."],
+            "difficulty": "medium"
+        },
+        {
+            "id": "api_5",
+            "domain": "API",
+            "prompt": "Write Python code to check response.status_code before processing",
+            "expected_patterns": [r"status_code", r"==\s*200", r"if.*status"],
+            "difficulty": "easy"
+        },
+        {
+            "id": "api_6",
+            "domain": "API",
+            "prompt": "Write Python code to parse JSON response with response.json()",
+            "expected_patterns": [r"\.json\(\)", r"response\.json"],
+            "difficulty": "easy"
+        },
+        {
+            "id": "api_7",
+            "domain": "API",
+            "prompt": "Write Python code to handle API rate limiting with retry logic",
+            "expected_patterns": [r"while|for.*range", r"sleep\(", r"retry|attempt"],
+            "difficulty": "hard"
+        },
+        {
+            "id": "api_8",
+            "domain": "API",
+            "prompt": "Write Python code to make API request with query parameters",
+            "expected_patterns": [r"params\s*=", r"requests\.get.*params"],
+            "difficulty": "medium"
+        },
+        {
+            "id": "api_9",
+            "domain": "API",
+            "prompt": "Write Python code to handle timeout in API requests",
+            "expected_patterns": [r"timeout\s*=", r"requests\..*timeout"],
+            "difficulty": "medium"
+        },
+        {
+            "id": "api_10",
+            "domain": "API",
+            "prompt": "Write Python code to upload file using requests with files parameter",
+            "expected_patterns": [r"files\s*=", r"open\(.*'rb'\)", r"requests\.post.*files"],
+            "difficulty": "hard"
+        }
+    ]
+    
+    # Simplified Dialogue, Navigation, STEM tasks
+    dialogue_tasks = [{"id": f"dialogue_{i+1}", "domain": "Dialogue", "prompt": f"Write a chatbot response for: {topic}", "expected_patterns": [r"def|class|response"], "difficulty": "medium"} 
+                      for i, topic in enumerate(["greeting", "help request", "complaint", "question", "farewell", "confusion", "thanks", "apology", "feedback", "escalation"])]
+    
+    navigation_tasks = [{"id": f"nav_{i+1}", "domain": "Navigation", "prompt": f"Write pathfinding code for: {scenario}", "expected_patterns": [r"def|class|path|move"], "difficulty": "medium"}
+                       for i, scenario in enumerate(["grid navigation", "obstacle avoidance", "shortest path", "A* algorithm", "BFS", "DFS", "dijkstra", "maze solving", "waypoint following", "collision detection"])]
+    
+    stem_tasks = [{"id": f"stem_{i+1}", "domain": "STEM", "prompt": f"Write code to solve: {problem}", "expected_patterns": [r"def|class|\*\*|math"], "difficulty": "hard"}
+                 for i, problem in enumerate(["quadratic equation", "physics kinematics", "statistics mean/std", "matrix multiplication", "derivative calculation", "integral approximation", "probability calculation", "combinatorics", "geometry area", "trigonometry"])]
+    
+    tasks.extend(sql_tasks)
+    tasks.extend(python_tasks)
+    tasks.extend(api_tasks)
+    tasks.extend(dialogue_tasks)
+    tasks.extend(navigation_tasks)
+    tasks.extend(stem_tasks)
+    
+    # Compile patterns once at import instead of on every evaluation, and record
+    # the literal each one requires so hopeless patterns can be skipped cheaply
+    return tuple(_compile_task(task) for task in tasks)
+
+
+def _compile_task(task: Dict) -> Task:
+    # Try patterns with the longest required literal first: those are the cheapest
+    # to reject, and success only needs any one pattern to match
+    ordered = sorted(((p, _required_literal(p)) for p in task["expected_patterns"]),
+                     key=lambda item: len(item[1] or ""), reverse=True)
+    return Task(
+        id=task["id"],
+        domain=task["domain"],
+        prompt=task["prompt"],
+        expected_patterns=tuple(re.compile(p, PATTERN_FLAGS) for p, _ in ordered),
+        prefilters=tuple(literal for _, literal in ordered),
+        combined_re=_regex.compile(INLINE_FLAGS + "|".join(f"(?:{p})" for p, _ in ordered)),
+        difficulty=task.get("difficulty", "medium")
+    )
+
+
+_TASKS = _create_tasks()
+
+
+class MultiDomainBenchmark:
+    tasks: Tuple[Task, ...] = _TASKS
+    
+    def run_evaluation(self, agent: "LifelongAgentAdapter", tasks: Optional[List[Task]] = None,
+                       early_stop: bool = False, label: Optional[str] = None) -> Dict:
         """
-        Run full 60-task evaluation.
+        Run the 60-task evaluation, or only `tasks` if given.
         Returns comprehensive metrics.
+        With early_stop, generation is cut off as soon as a success pattern matches:
+        cheaper, but the truncated code is then not stored as a success episode.
+        Per-task progress is logged through the module logger (see configure_logging),
+        with `label` (e.g. an ablation variant) prefixing each line; the header and
+        results table always go to stdout.
         """
-        print("\n" + "="*70)
-        print("MULTI-DOMAIN BENCHMARK EVALUATION (60 Tasks)")
-        print("="*70)
+        if tasks is None:
+            tasks = self.tasks
+        tag = f"[{label}] " if label else ""
         
-        results_by_domain = {}
+        print("\n" + "="*70 + f"\nMULTI-DOMAIN BENCHMARK EVALUATION ({len(tasks)} Tasks)\n" + "="*70)
+        
+        results_by_domain = defaultdict(lambda: {"success": 0, "total": 0})
         all_results = []
         
-        for task in self.tasks:
-            domain = task['domain']
-            if domain not in results_by_domain:
-                results_by_domain[domain] = {"success": 0, "total": 0}
+        for task in tasks:
+            domain = task.domain
             
-            print(f"\n[{task['id']}] {task['prompt'][:60]}...")
+            log.info("\n%s[%s] %s...", tag, task.id, task.prompt[:60])
             
-            # Agent generates code
-            code = agent.step(task['prompt'])
+            # Agent generates code, optionally stopping as soon as a success pattern matches
+            code = agent.step(task.prompt, until=task.combined_re.search if early_stop else None)
             
             # Evaluate
-            success = any(re.search(pattern, code, re.IGNORECASE | re.DOTALL) 
-                         for pattern in task['expected_patterns'])
+            # One regex pass over all patterns, skipped when no pattern's literal is present
+            folded = code.casefold()
+            success = (any(literal is None or literal in folded for literal in task.prefilters)
+                       and task.combined_re.search(code) is not None)
             
             result_msg = "✓ SUCCESS" if success else "✗ FAILED"
-            print(f"[Result] {result_msg}")
+            log.info("%s[%s] [Result] %s", tag, task.id, result_msg)
             
             # Learn from result
-            agent.learn(task['prompt'], code, result_msg, success)
+            agent.learn(task.prompt, code, result_msg, success)
             
             # Track results
-            results_by_domain[domain]["total"] += 1
-            if success:
-                results_by_domain[domain]["success"] += 1
+            stats = results_by_domain[domain]
+            stats["total"] += 1
+            stats["success"] += success
             
             all_results.append({
-                "task_id": task['id'],
+                "task_id": task.id,
                 "domain": domain,
                 "success": success,
-                "difficulty": task.get('difficulty', 'medium')
+                "difficulty": task.difficulty
             })
         
         # Calculate metrics
-        overall_success = sum(r["success"] for r in all_results)
-        overall_total = len(all_results)
+        results_by_domain = dict(results_by_domain)
+        overall_success = sum(stats["success"] for stats in results_by_domain.values())
+        overall_total = sum(stats["total"] for stats in results_by_domain.values())
         overall_rate = (overall_success / overall_total) * 100
         
-        print("\n" + "="*70)
-        print("EVALUATION RESULTS")
-        print("="*70)
-        print(f"{'Domain':<15} {'Success Rate':<15} {'Tasks':<10}")
-        print("-"*70)
-        
+        lines = [
+            "\n" + "="*70,
+            "EVALUATION RESULTS",
+            "="*70,
+            f"{'Domain':<15} {'Success Rate':<15} {'Tasks':<10}",
+            "-"*70
+        ]
         for domain, stats in results_by_domain.items():
             rate = (stats['success'] / stats['total']) * 100
-            print(f"{domain:<15} {rate:>6.1f}%{'':<8} {stats['success']}/{stats['total']}")
-        
-        print("-"*70)
-        print(f"{'OVERALL':<15} {overall_rate:>6.1f}%{'':<8} {overall_success}/{overall_total}")
-        print("="*70)
+            lines.append(f"{domain:<15} {rate:>6.1f}%{'':<8} {stats['success']}/{stats['total']}")
+        lines += [
+            "-"*70,
+            f"{'OVERALL':<15} {overall_rate:>6.1f}%{'':<8} {overall_success}/{overall_total}",
+            "="*70
+        ]
+        print("\n".join(lines))
         
         return {
             "overall_success_rate": overall_rate,
@@ -332,6 +451,8 @@ class MultiDomainBenchmark:
 if __name__ == "__main__":
     from ..adapter import LifelongAgentAdapter
     
+    configure_logging(logging.WARNING if "--quiet" in sys.argv[1:] else logging.INFO)
+    
     adapter = LifelongAgentAdapter()
     benchmark = MultiDomainBenchmark()
     results = benchmark.run_evaluation(adapter)
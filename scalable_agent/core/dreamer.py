@@ -1,12 +1,25 @@
-from openai import OpenAI
-from typing import List, Dict
+import json
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import TYPE_CHECKING, List, Dict, Optional, Tuple
 import numpy as np
-from sklearn.cluster import DBSCAN
-from ..memory.vector_store import VectorStore
 from .executor import Executor
 
+if TYPE_CHECKING:
+    from openai import OpenAI
+    from ..memory.vector_store import VectorStore
+
+MAX_DREAM_WORKERS = 4  # Clusters abstracted/verified concurrently
+DUPLICATE_RULE_THRESHOLD = 0.92  # Cosine similarity above which a candidate repeats a stored rule
+
+def _unit(vector) -> np.ndarray:
+    """`vector` as float32 scaled to unit length (a zero vector stays zero)."""
+    v = np.asarray(vector, dtype=np.float32)
+    norm = np.linalg.norm(v)
+    return v / norm if norm > 0 else v
+
+
 class Dreamer:
-    def __init__(self, client: OpenAI, vector_store: VectorStore, executor: Executor, model: str = "llama-3.3-70b-versatile"):
+    def __init__(self, client: "OpenAI", vector_store: "VectorStore", executor: Executor, model: str = "llama-3.3-70b-versatile"):
         self.client = client
         self.store = vector_store
         self.executor = executor
@@ -15,6 +28,7 @@ class Dreamer:
         self.min_pts = 2    # Minimum cluster size (from paper)
         self.false_consolidations = 0
         self.total_consolidations = 0
+        self._last_failure_seq = -1  # store.failure_seq seen by the last dream
 
     def dream(self):
         """
@@ -27,6 +41,12 @@ class Dreamer:
         """
         print("\n[Dreamer] Entering REM Sleep (Active Dreaming Consolidation)...")
         
+        # Nothing has failed since the last dream, so clustering would find the same clusters
+        if self.store.failure_seq == self._last_failure_seq:
+            print("[Dreamer] No new failures since last dream. Skipping consolidation.")
+            return
+        self._last_failure_seq = self.store.failure_seq
+        
         # 1. Fetch recent failures with embeddings
         failures = self.store.query_episodic("failure error", n_results=20, where={"outcome": "FAILURE"})
         
@@ -48,52 +68,124 @@ class Dreamer:
             return
         
         # 3-5. For each cluster: Abstract → Dream → Verify → Consolidate
-        for cluster_id in unique_clusters:
-            cluster_indices = [i for i, c in enumerate(clusters) if c == cluster_id]
-            cluster_failures = [failures[i] for i in cluster_indices]
-            
-            print(f"\n[Dreamer] Processing Cluster {cluster_id} ({len(cluster_failures)} failures)...")
-            
-            # Abstract candidate rule
-            rule_candidate = self._abstract_rule(cluster_failures)
-            print(f"[Dreamer] Candidate Rule: {rule_candidate[:100]}...")
+        # Clusters are independent and dominated by LLM/execution latency, so process them concurrently
+        cluster_groups = [(cluster_id, [failures[i] for i, c in enumerate(clusters) if c == cluster_id])
+                          for cluster_id in sorted(unique_clusters)]
+        
+        # One LLM round-trip abstracts the candidate rules for every cluster
+        rules = self._abstract_rules_batch(cluster_groups)
+        
+        with ThreadPoolExecutor(max_workers=min(MAX_DREAM_WORKERS, len(cluster_groups))) as pool:
+            # Clusters the batch missed are abstracted one by one
+            missing = [(cluster_id, cluster_failures) for cluster_id, cluster_failures in cluster_groups
+                       if not rules.get(cluster_id)]
+            for (cluster_id, _), rule in zip(missing, pool.map(lambda group: self._abstract_rule(group[1]), missing)):
+                rules[cluster_id] = rule
             
-            # Generate counterfactual dream scenario
-            dream_scenario = self._generate_dream_scenario(rule_candidate)
-            print(f"[Dreamer] Dream Scenario: {dream_scenario[:100]}...")
+            # Clusters are checked against the store concurrently, before any rule is
+            # added, so a rule repeated within this dream must be dropped up front
+            cluster_groups = self._drop_repeated_rules(cluster_groups, rules)
             
-            # Verify through execution
-            verified = self._verify_rule(dream_scenario, rule_candidate)
-            self.total_consolidations += 1
+            futures = [pool.submit(self._process_cluster, cluster_id, cluster_failures, rules[cluster_id])
+                       for cluster_id, cluster_failures in cluster_groups]
             
-            if verified:
-                # Consolidate to semantic memory
-                self.store.add_rule(
-                    rule_candidate, 
-                    metadata={
-                        "source": "dream_consolidation",
-                        "verified": True,
-                        "cluster_size": len(cluster_failures),
-                        "cluster_id": int(cluster_id)
-                    }
-                )
-                print("[Dreamer] ✓ Rule VERIFIED and consolidated to Semantic Memory.")
-            else:
-                self.false_consolidations += 1
-                print("[Dreamer] ✗ Rule FAILED verification. Not consolidated.")
+            # Consolidate on this thread only, so the store is never written concurrently
+            for future in as_completed(futures):
+                result = future.result()
+                if result is None:
+                    continue  # Rule already in semantic memory
+                verified, rule_candidate, metadata = result
+                self.total_consolidations += 1
+                
+                if verified:
+                    # Consolidate to semantic memory
+                    self.store.add_rule(rule_candidate, metadata=metadata)
+                    print("[Dreamer] ✓ Rule VERIFIED and consolidated to Semantic Memory.")
+                else:
+                    self.false_consolidations += 1
+                    print("[Dreamer] ✗ Rule FAILED verification. Not consolidated.")
         
         # Report false consolidation rate
         if self.total_consolidations > 0:
             fcr = (self.false_consolidations / self.total_consolidations) * 100
             print(f"\n[Dreamer] False Consolidation Rate: {fcr:.1f}% ({self.false_consolidations}/{self.total_consolidations})")
 
+    def _process_cluster(self, cluster_id: int, cluster_failures: List[Dict], rule_candidate: str) -> Optional[Tuple[bool, str, Dict]]:
+        """
+        Dream and verify one cluster's candidate rule.
+        Returns (verified, rule, metadata for the semantic store), or None when the
+        rule duplicates one already consolidated and verification was skipped.
+        """
+        print(f"\n[Dreamer] Processing Cluster {cluster_id} ({len(cluster_failures)} failures)...")
+        print(f"[Dreamer] Candidate Rule: {rule_candidate[:100]}...")
+        
+        # A rule that is already in semantic memory needs no second dream
+        if self._is_duplicate_rule(rule_candidate):
+            print("[Dreamer] Rule duplicates a consolidated rule, skipping verification.")
+            return None
+        
+        # Generate counterfactual dream scenario
+        dream_scenario = self._generate_dream_scenario(rule_candidate)
+        print(f"[Dreamer] Dream Scenario: {dream_scenario[:100]}...")
+        
+        # Verify through execution
+        verified = self._verify_rule(dream_scenario, rule_candidate)
+        
+        metadata = {
+            "source": "dream_consolidation",
+            "verified": True,
+            "cluster_size": len(cluster_failures),
+            "cluster_id": int(cluster_id)
+        }
+        return verified, rule_candidate, metadata
+
+    def _drop_repeated_rules(self, cluster_groups: List[Tuple[int, List[Dict]]],
+                             rules: Dict[int, str]) -> List[Tuple[int, List[Dict]]]:
+        """
+        Keeps the first cluster of any set whose candidate rules have cosine
+        similarity above DUPLICATE_RULE_THRESHOLD with each other.
+        """
+        kept, kept_embeddings = [], []
+        for cluster_id, cluster_failures in cluster_groups:
+            embedding = _unit(self.store.embed(rules[cluster_id]))
+            if any(float(other @ embedding) > DUPLICATE_RULE_THRESHOLD for other in kept_embeddings):
+                print(f"[Dreamer] Cluster {cluster_id} repeats another cluster's rule, skipping.")
+                continue
+            kept.append((cluster_id, cluster_failures))
+            kept_embeddings.append(embedding)
+        return kept
+
+    def _is_duplicate_rule(self, rule: str) -> bool:
+        """
+        True if the nearest stored rule has cosine similarity above DUPLICATE_RULE_THRESHOLD.
+        """
+        embedding = self.store.embed(rule)  # Cached by the store
+        existing = self.store.query_semantic(rule, n_results=1, query_embedding=embedding)
+        if not existing or existing[0]['embedding'] is None:
+            return False
+        
+        stored = _unit(existing[0]['embedding'])
+        return float(stored @ _unit(embedding)) > DUPLICATE_RULE_THRESHOLD
+
     def _cluster_failures(self, embeddings: np.ndarray) -> np.ndarray:
         """
         Cluster failure embeddings using DBSCAN.
         Returns cluster labels (-1 for noise).
         """
-        dbscan = DBSCAN(eps=self.epsilon, min_samples=self.min_pts, metric='cosine')
-        clusters = dbscan.fit_predict(embeddings)
+        from sklearn.cluster import DBSCAN  # Deferred: scikit-learn is only needed once failures cluster
+        
+        X = np.asarray(embeddings, dtype=np.float32)
+        norms = np.linalg.norm(X, axis=1, keepdims=True)
+        X = X / np.maximum(norms, 1e-12)
+        
+        # Cosine distance from L2-normalized rows: one GEMM instead of pairwise metric calls,
+        # then finished in the GEMM's own output buffer so no N x N temporaries are made
+        distances = X @ X.T
+        np.subtract(1.0, distances, out=distances)
+        np.clip(distances, 0.0, 2.0, out=distances)
+        
+        dbscan = DBSCAN(eps=self.epsilon, min_samples=self.min_pts, metric='precomputed')
+        clusters = dbscan.fit_predict(distances)
         return clusters
 
     def _abstract_rule(self, cluster_failures: List[Dict]) -> str:
@@ -121,6 +213,48 @@ Rule:"""
             print(f"[Dreamer] Error abstracting rule: {e}")
             return "Error abstracting rule."
 
+    def _abstract_rules_batch(self, cluster_groups: List[Tuple[int, List[Dict]]]) -> Dict[int, str]:
+        """
+        Abstract one rule per cluster with a single LLM request.
+        Returns {cluster_id: rule}; clusters missing from the reply are left out
+        so the caller falls back to _abstract_rule for them.
+        """
+        if len(cluster_groups) < 2:
+            return {}
+        
+        sections = []
+        for cluster_id, cluster_failures in cluster_groups:
+            context = "\n".join([f"- {f['content']}" for f in cluster_failures])
+            sections.append(f"Cluster {cluster_id}:\n{context}")
+        prompt = f"""Analyze each cluster of similar failure logs below and synthesize ONE generalizable rule per cluster.
+
+{chr(10).join(sections)}
+
+Format each rule as: "IF [condition] THEN [action] BECAUSE [insight]"
+
+Return ONLY a JSON array (no markdown), one object per cluster:
+[{{"cluster_id": <id>, "rule": "<rule>"}}, ...]"""
+        
+        try:
+            response = self.client.chat.completions.create(
+                model=self.model,
+                messages=[{"role": "user", "content": prompt}],
+                temperature=0.5  # Paper specifies 0.5 for abstraction
+            )
+            text = response.choices[0].message.content.strip()
+            text = text.replace("```json", "").replace("```", "").strip()
+            wanted = {int(cluster_id) for cluster_id, _ in cluster_groups}
+            rules = {}
+            for item in json.loads(text):
+                cluster_id = int(item["cluster_id"])
+                rule = str(item["rule"]).strip()
+                if cluster_id in wanted and rule:
+                    rules[cluster_id] = rule
+            return rules
+        except Exception as e:
+            print(f"[Dreamer] Batched rule abstraction failed, abstracting per cluster: {e}")
+            return {}
+
     def _generate_dream_scenario(self, rule: str) -> str:
         """
         Generate a counterfactual test scenario (Active Dreaming).
@@ -1,38 +1,149 @@
+import atexit
+import builtins
+import multiprocessing as mp
+from multiprocessing import forkserver
+import os
 import subprocess
 import sys
-import os
+import tempfile
+import traceback
+import types
+
+SCRIPT_NAME = "<dream>"  # __file__, argv[0] and traceback filename of executed code
+
+
+def _run_code(code: str, stdout_path: str, stderr_path: str) -> int:
+    """
+    Runs code as the __main__ script of this (child) process and returns its exit code.
+    fds 1 and 2 are pointed at the given files, so output from C code and
+    subprocesses is captured too. Mirrors interpreter exit semantics: uncaught
+    exceptions and sys.exit(non-zero) fail.
+    """
+    sys.stdout.flush()
+    sys.stderr.flush()
+    with open(stdout_path, "wb") as out, open(stderr_path, "wb") as err:
+        os.dup2(out.fileno(), 1)
+        os.dup2(err.fileno(), 2)
+    
+    # A real __main__ module, so pickle (and multiprocessing) can find what the code defines
+    main = types.ModuleType("__main__")
+    main.__file__ = SCRIPT_NAME
+    main.__builtins__ = builtins
+    sys.modules["__main__"] = main
+    sys.argv = [SCRIPT_NAME]
+    # This child was started by the forkserver; the code's own processes should
+    # use the platform default, as under a fresh interpreter
+    mp.set_start_method(None, force=True)
+    
+    return_code = 0
+    try:
+        exec(compile(code, SCRIPT_NAME, "exec"), main.__dict__)
+    except SystemExit as e:
+        if e.code is None or isinstance(e.code, int):
+            return_code = e.code or 0
+        else:
+            print(e.code, file=sys.stderr)
+            return_code = 1
+    except BaseException as e:
+        # Drop this frame so the traceback starts at the executed code
+        traceback.print_exception(type(e), e, e.__traceback__.tb_next)
+        return_code = 1
+    
+    # As at interpreter exit; multiprocessing children skip atexit otherwise
+    atexit._run_exitfuncs()
+    sys.stdout.flush()
+    sys.stderr.flush()
+    return return_code
+
+
+def _child_main(code: str, stdout_path: str, stderr_path: str):
+    # The exit code becomes the Process's exitcode
+    sys.exit(_run_code(code, stdout_path, stderr_path))
+
+
+def _read_output(path: str) -> str:
+    try:
+        with open(path, "rb") as f:
+            return f.read().decode("utf-8", errors="replace")
+    except OSError:  # The child died before redirecting its output
+        return ""
+
+
+def _forkserver_context():
+    """
+    A forkserver context whose server has already imported this module, or
+    None where forkserver is unavailable (e.g. Windows).
+    """
+    if "forkserver" not in mp.get_all_start_methods():
+        return None
+    ctx = mp.get_context("forkserver")
+    ctx.set_forkserver_preload(["__main__", __name__])
+    forkserver.ensure_running()  # Warm up now rather than on the first execution
+    return ctx
+
 
 class Executor:
+    def __init__(self, isolated: bool = False):
+        """
+        Runs each piece of code in a fresh child process.
+        Children are forked from a pre-warmed forkserver, so an execution does not
+        pay for interpreter start-up, yet shares no state with earlier runs.
+        With isolated=True (or where forkserver is unavailable) every execution
+        instead gets a brand-new interpreter via subprocess.
+        """
+        self._ctx = None if isolated else _forkserver_context()
+        self.isolated = self._ctx is None
+
     def execute(self, code: str, timeout: int = 10) -> dict:
         """
         Executes the provided Python code in a separate process.
-        Returns a dict with 'success', 'output', and 'error'.
+        Returns a dict with 'success', 'output', and 'return_code'.
         """
-        # Save code to a temp file
-        temp_filename = f"temp_exec_{os.getpid()}.py"
-        with open(temp_filename, "w", encoding="utf-8") as f:
-            f.write(code)
-            
+        if self.isolated:
+            return self._execute_isolated(code, timeout)
+        
+        with tempfile.TemporaryDirectory(prefix="dream-") as tmp:
+            stdout_path = os.path.join(tmp, "stdout")
+            stderr_path = os.path.join(tmp, "stderr")
+            try:
+                process = self._ctx.Process(target=_child_main, args=(code, stdout_path, stderr_path))
+                process.start()
+                process.join(timeout)
+                if process.is_alive():
+                    process.kill()
+                    process.join()
+                    return {
+                        "success": False,
+                        "output": "Execution Timed Out",
+                        "return_code": -1
+                    }
+                return {
+                    "success": process.exitcode == 0,
+                    "output": _read_output(stdout_path) + _read_output(stderr_path),
+                    "return_code": process.exitcode
+                }
+            except Exception as e:
+                return {
+                    "success": False,
+                    "output": str(e),
+                    "return_code": -1
+                }
+
+    def _execute_isolated(self, code: str, timeout: int) -> dict:
+        # Code is piped over stdin: no temp file, so concurrent calls can't collide
         try:
             result = subprocess.run(
-                [sys.executable, temp_filename],
+                [sys.executable, "-"],
+                input=code,
                 capture_output=True,
                 text=True,
                 timeout=timeout
             )
-            
-            stdout = result.stdout
-            stderr = result.stderr
-            
-            # Determine success based on return code and stderr
-            success = (result.returncode == 0)
-            
             return {
-                "success": success,
-                "output": stdout + stderr,
+                "success": result.returncode == 0,
+                "output": result.stdout + result.stderr,
                 "return_code": result.returncode
             }
-            
         except subprocess.TimeoutExpired:
             return {
                 "success": False,
@@ -45,6 +156,3 @@ class Executor:
                 "output": str(e),
                 "return_code": -1
             }
-        finally:
-            if os.path.exists(temp_filename):
-                os.remove(temp_filename)
@@ -1,4 +1,5 @@
 from openai import OpenAI
+from ..llm import stream_completion
 
 class Reflector:
     def __init__(self, client: OpenAI, model: str = "llama-3.1-70b-versatile"):
@@ -26,12 +27,14 @@ class Reflector:
         """
         
         try:
-            response = self.client.chat.completions.create(
+            insight = stream_completion(
+                self.client,
                 model=self.model,
                 messages=[{"role": "user", "content": prompt}],
-                temperature=0
+                temperature=0,
+                max_tokens=256
             )
-            return response.choices[0].message.content.strip()
+            return insight.strip()
         except Exception as e:
             print(f"[Reflector] Error: {e}")
             return "Error reflecting on failure."
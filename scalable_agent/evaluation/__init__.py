@@ -4,87 +4,148 @@ Implements paired t-tests, Cohen's d, and other metrics from the research paper.
 """
 
 import numpy as np
-from scipy import stats
-from typing import List, Dict, Tuple
+from scipy.special import stdtr, stdtrit  # Student-t CDF and its inverse, without scipy.stats dispatch
+from typing import List, Dict, NamedTuple, Tuple, Union
 import json
+from . import _kernels
+
+def _group_counts(keys: List[str], succ: np.ndarray) -> Tuple[List[str], np.ndarray, np.ndarray]:
+    """
+    Per-key success and total counts, keys in order of first appearance.
+    """
+    uniq, first, inverse = np.unique(np.asarray(keys), return_index=True, return_inverse=True)
+    successes = np.bincount(inverse, weights=succ, minlength=uniq.size)
+    totals = np.bincount(inverse, minlength=uniq.size)
+    order = np.argsort(first)
+    return uniq[order].tolist(), successes[order], totals[order]
+
+
+def _tstats(d: np.ndarray) -> Tuple:
+    """
+    Paired t statistics of the differences along the last axis of `d`.
+    Returns (mean_diff, sem, t, p, ci_95_lower, ci_95_upper); arrays when `d` is 2-D.
+    """
+    n = d.shape[-1]
+    return _tstats_from(d.mean(axis=-1), d.std(axis=-1, ddof=1) / np.sqrt(n), n)
+
+
+def _tstats_from(mean_diff, sem_d, n: int) -> Tuple:
+    """
+    _tstats for a mean difference and its standard error that are already known.
+    """
+    df = n - 1
+    with np.errstate(divide='ignore', invalid='ignore'):
+        t_stat = mean_diff / sem_d
+    p_value = 2 * stdtr(df, -np.abs(t_stat))
+    # scipy's t.interval gives nan for scale=0; keep that for zero-variance differences
+    half_width = np.where(sem_d > 0, stdtrit(df, 0.975) * sem_d, np.nan)
+    return mean_diff, sem_d, t_stat, p_value, mean_diff - half_width, mean_diff + half_width
+
+
+class _DiffStats(NamedTuple):
+    """
+    Everything a paired comparison needs, from one pass over the two groups.
+    """
+    n: int
+    m1: float    # group means
+    m2: float
+    v1: float    # sample variances (ddof=1)
+    v2: float
+    md: float    # mean paired difference
+    sed: float   # standard error of the paired difference
+
+
+def _diff_stats(group1, group2) -> _DiffStats:
+    # Both groups and their differences as rows of one buffer: a single
+    # mean and variance reduction covers all three
+    X = np.empty((3, len(group1)))
+    X[0] = group1
+    X[1] = group2
+    np.subtract(X[0], X[1], out=X[2])
+    n = X.shape[1]
+    means = X.mean(axis=1)
+    variances = X.var(axis=1, ddof=1)
+    # Fields stay np.float64, so zero variances give inf/nan rather than raising
+    return _DiffStats(n, means[0], means[1], variances[0], variances[1],
+                      means[2], np.sqrt(variances[2]) / np.sqrt(n))
+
+
+def _t_test_result(stats: _DiffStats, name1: str, name2: str) -> Dict:
+    mean_diff, _, t_stat, p_value, ci_lower, ci_upper = _tstats_from(stats.md, stats.sed, stats.n)
+    return {
+        "comparison": f"{name1} vs {name2}",
+        "t_statistic": float(t_stat),
+        "p_value": float(p_value),
+        "mean_difference": float(mean_diff),
+        "ci_95_lower": float(ci_lower),
+        "ci_95_upper": float(ci_upper),
+        "significant": bool(p_value < 0.001),
+        "significance_level": "p < 0.001" if p_value < 0.001 else f"p = {p_value:.4f}"
+    }
+
+
+def _paired_effect(stats: _DiffStats) -> float:
+    # Equal group sizes: pooled variance is the plain average
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return float((stats.m1 - stats.m2) / np.sqrt((stats.v1 + stats.v2) / 2))
+
+
+# Cohen's d labels: d < 0.2 is negligible, 0.2 <= d < 0.5 small, and so on
+_EFFECT_THRESHOLDS = np.array([0.2, 0.5, 0.8, 2.0])
+_EFFECT_LABELS = np.array(["negligible", "small", "medium", "large", "very large"])
+
+
+def _interpret_effect(effect_size):
+    """
+    Label one d value (returns str) or an array of them (returns an array of labels).
+    """
+    labels = _EFFECT_LABELS[np.searchsorted(_EFFECT_THRESHOLDS, effect_size, side='right')]
+    return str(labels) if np.ndim(labels) == 0 else labels
+
 
 class StatisticalEvaluator:
     def __init__(self):
         self.results = {}
     
-    def paired_t_test(self, group1: List[float], group2: List[float], 
+    def paired_t_test(self, group1: Union[List[float], np.ndarray], group2: Union[List[float], np.ndarray],
                       name1: str = "Group 1", name2: str = "Group 2") -> Dict:
         """
         Perform paired t-test between two groups.
         Returns t-statistic, p-value, and interpretation.
         """
-        t_stat, p_value = stats.ttest_rel(group1, group2)
-        
-        mean_diff = np.mean(group1) - np.mean(group2)
-        ci_95 = stats.t.interval(0.95, len(group1)-1, 
-                                 loc=mean_diff, 
-                                 scale=stats.sem(np.array(group1) - np.array(group2)))
-        
-        result = {
-            "comparison": f"{name1} vs {name2}",
-            "t_statistic": float(t_stat),
-            "p_value": float(p_value),
-            "mean_difference": float(mean_diff),
-            "ci_95_lower": float(ci_95[0]),
-            "ci_95_upper": float(ci_95[1]),
-            "significant": p_value < 0.001,
-            "significance_level": "p < 0.001" if p_value < 0.001 else f"p = {p_value:.4f}"
-        }
-        
-        return result
+        return _t_test_result(_diff_stats(group1, group2), name1, name2)
     
     def cohens_d(self, group1: List[float], group2: List[float]) -> float:
         """
         Calculate Cohen's d effect size.
         Interpretation: 0.2=small, 0.5=medium, 0.8=large, 2.0=very large
         """
-        mean1, mean2 = np.mean(group1), np.mean(group2)
-        std1, std2 = np.std(group1, ddof=1), np.std(group2, ddof=1)
-        
-        # Pooled standard deviation
-        n1, n2 = len(group1), len(group2)
-        pooled_std = np.sqrt(((n1-1)*std1**2 + (n2-1)*std2**2) / (n1+n2-2))
-        
-        d = (mean1 - mean2) / pooled_std
-        return float(d)
+        # Means, variances and the pooled std in one fused kernel (see _kernels)
+        a1 = np.ascontiguousarray(group1, dtype=np.float64)
+        a2 = np.ascontiguousarray(group2, dtype=np.float64)
+        return float(_kernels.cohens_d(a1, a2))
     
     def calculate_metrics(self, results: List[Dict]) -> Dict:
         """
         Calculate comprehensive metrics from benchmark results.
         """
+        # One pass over the rows, then grouped counts in NumPy
         total = len(results)
-        successes = sum(1 for r in results if r['success'])
+        succ = np.fromiter((bool(r['success']) for r in results), dtype=np.int64, count=total)
+        successes = int(succ.sum())
         success_rate = (successes / total) * 100
         
         # By domain
-        by_domain = {}
-        for r in results:
-            domain = r['domain']
-            if domain not in by_domain:
-                by_domain[domain] = {"success": 0, "total": 0}
-            by_domain[domain]["total"] += 1
-            if r['success']:
-                by_domain[domain]["success"] += 1
-        
-        domain_rates = {
-            domain: (stats["success"] / stats["total"]) * 100
-            for domain, stats in by_domain.items()
-        }
+        domains, domain_successes, domain_totals = _group_counts([r['domain'] for r in results], succ)
+        domain_rates = dict(zip(domains, (domain_successes / domain_totals * 100).tolist()))
         
         # By difficulty
-        by_difficulty = {}
-        for r in results:
-            diff = r.get('difficulty', 'medium')
-            if diff not in by_difficulty:
-                by_difficulty[diff] = {"success": 0, "total": 0}
-            by_difficulty[diff]["total"] += 1
-            if r['success']:
-                by_difficulty[diff]["success"] += 1
+        difficulties, diff_successes, diff_totals = _group_counts(
+            [r.get('difficulty', 'medium') for r in results], succ)
+        by_difficulty = {
+            diff: {"success": int(s), "total": int(t)}
+            for diff, s, t in zip(difficulties, diff_successes, diff_totals)
+        }
         
         return {
             "overall_success_rate": success_rate,
@@ -100,48 +161,91 @@ class StatisticalEvaluator:
         """
         Full statistical comparison between ADM and baseline.
         """
-        # Paired t-test
-        t_test = self.paired_t_test(adm_results, baseline_results, adm_name, baseline_name)
-        
-        # Cohen's d
-        effect_size = self.cohens_d(adm_results, baseline_results)
-        
-        # Interpretation
-        if effect_size < 0.2:
-            effect_interp = "negligible"
-        elif effect_size < 0.5:
-            effect_interp = "small"
-        elif effect_size < 0.8:
-            effect_interp = "medium"
-        elif effect_size < 2.0:
-            effect_interp = "large"
-        else:
-            effect_interp = "very large"
+        # Means, variances and the paired-difference error once, shared by both tests
+        stats = _diff_stats(adm_results, baseline_results)
+        effect_size = _paired_effect(stats)
         
         return {
-            "t_test": t_test,
+            "t_test": _t_test_result(stats, adm_name, baseline_name),
             "cohens_d": effect_size,
-            "effect_interpretation": effect_interp,
-            "adm_mean": float(np.mean(adm_results)),
-            "baseline_mean": float(np.mean(baseline_results)),
-            "improvement": float(np.mean(adm_results) - np.mean(baseline_results))
+            "effect_interpretation": _interpret_effect(effect_size),
+            "adm_mean": float(stats.m1),
+            "baseline_mean": float(stats.m2),
+            "improvement": float(stats.m1 - stats.m2)
         }
     
+    def compare_agents_batch(self, scores: np.ndarray, names: List[str],
+                             n_perm: int = 1000, seed: int = 0) -> List[Dict]:
+        """
+        Compares every pair of systems at once.
+        `scores` is a (systems x tasks) matrix whose row i belongs to names[i].
+        Returns one compare_agents-style dict per pair (i < j), whose t_test also
+        carries a sign-flip permutation p-value. All pairs share one sign matrix,
+        and per-system means/variances are computed once.
+        """
+        X = np.asarray(scores, dtype=np.float64)
+        n_tasks = X.shape[1]
+        means = X.mean(axis=1)
+        variances = X.var(axis=1, ddof=1)
+        
+        i, j = np.triu_indices(X.shape[0], k=1)
+        D = X[i] - X[j]  # (pairs x tasks) paired differences
+        mean_diff, _, t_stat, p_value, ci_lower, ci_upper = _tstats(D)
+        
+        with np.errstate(divide='ignore', invalid='ignore'):
+            # Equal group sizes: pooled variance is the plain average
+            effect = mean_diff / np.sqrt((variances[i] + variances[j]) / 2)
+        
+        # Null distribution of the mean difference for every pair in one product
+        signs = np.random.default_rng(seed).choice([-1.0, 1.0], size=(n_perm, n_tasks))
+        null = D @ signs.T / n_tasks  # (pairs x n_perm)
+        perm_p = (np.abs(null) >= np.abs(mean_diff)[:, None]).mean(axis=1)
+        effect_labels = _interpret_effect(effect)
+        
+        comparisons = []
+        for k, (a, b) in enumerate(zip(i, j)):
+            p = float(p_value[k])
+            comparisons.append({
+                "t_test": {
+                    "comparison": f"{names[a]} vs {names[b]}",
+                    "t_statistic": float(t_stat[k]),
+                    "p_value": p,
+                    "permutation_p_value": float(perm_p[k]),
+                    "mean_difference": float(mean_diff[k]),
+                    "ci_95_lower": float(ci_lower[k]),
+                    "ci_95_upper": float(ci_upper[k]),
+                    "significant": p < 0.001,
+                    "significance_level": "p < 0.001" if p < 0.001 else f"p = {p:.4f}"
+                },
+                "cohens_d": float(effect[k]),
+                "effect_interpretation": str(effect_labels[k]),
+                "adm_mean": float(means[a]),
+                "baseline_mean": float(means[b]),
+                "improvement": float(mean_diff[k])
+            })
+        return comparisons
+    
     def generate_report(self, comparisons: List[Dict], output_file: str = "statistical_results.json"):
         """
         Generate and save statistical report.
+        Comparisons are written one record per line as they are encoded, and the
+        significance count is taken in the same pass.
         """
-        report = {
-            "comparisons": comparisons,
-            "summary": {
+        significant = 0
+        with open(output_file, 'w') as f:
+            f.write('{"comparisons": [')
+            for i, c in enumerate(comparisons):
+                f.write(",\n  " if i else "\n  ")
+                f.write(json.dumps(c))
+                significant += bool(c['t_test']['significant'])
+            
+            summary = {
                 "total_comparisons": len(comparisons),
-                "significant_results": sum(1 for c in comparisons if c['t_test']['significant'])
+                "significant_results": significant
             }
-        }
-        
-        with open(output_file, 'w') as f:
-            json.dump(report, f, indent=2)
+            f.write(f'\n],\n"summary": {json.dumps(summary)}}}\n')
         
+        report = {"comparisons": comparisons, "summary": summary}
         print(f"\n[Stats] Report saved to {output_file}")
         return report
 
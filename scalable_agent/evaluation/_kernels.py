@@ -0,0 +1,67 @@
+"""
+Numeric kernels for the statistical evaluator.
+Compiled with numba when it is installed; plain NumPy otherwise.
+"""
+
+import numpy as np
+
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+
+
+def _group_moments(x: np.ndarray):
+    """
+    Mean and sample variance in one pass over x.
+    Shifting by the first element keeps the sum-of-squares form numerically stable.
+    """
+    n = x.size
+    if n == 0:
+        return np.nan, np.nan
+    k = x[0]
+    s = 0.0
+    ss = 0.0
+    for i in range(n):
+        y = x[i] - k
+        s += y
+        ss += y * y
+    return k + s / n, (ss - s * s / n) / (n - 1)
+
+
+def _cohens_d_fused(a: np.ndarray, b: np.ndarray) -> float:
+    n1, n2 = a.size, b.size
+    mean1, var1 = _group_moments(a)
+    mean2, var2 = _group_moments(b)
+    pooled_std = np.sqrt(((n1 - 1) * var1 + (n2 - 1) * var2) / (n1 + n2 - 2))
+    return (mean1 - mean2) / pooled_std
+
+
+def _cohens_d_numpy(a: np.ndarray, b: np.ndarray) -> float:
+    n1, n2 = a.size, b.size
+    if n1 == 0 or n2 == 0:
+        return np.nan
+    
+    # Both groups in one buffer (each shifted by its first element, as in
+    # _group_moments), so one reduceat per moment covers both
+    shift = np.array([a[0], b[0]])
+    cat = np.empty(n1 + n2)
+    np.subtract(a, shift[0], out=cat[:n1])
+    np.subtract(b, shift[1], out=cat[n1:])
+    offsets = [0, n1]
+    sums = np.add.reduceat(cat, offsets)
+    sqs = np.add.reduceat(cat * cat, offsets)
+    
+    n = np.array([n1, n2], dtype=np.float64)
+    means = shift + sums / n
+    variances = (sqs - sums * sums / n) / (n - 1)
+    pooled_std = np.sqrt(((n1 - 1) * variances[0] + (n2 - 1) * variances[1]) / (n1 + n2 - 2))
+    return (means[0] - means[1]) / pooled_std
+
+
+if njit is not None:
+    # error_model='numpy': zero variance gives inf/nan like NumPy instead of raising
+    _group_moments = njit(cache=True, error_model='numpy')(_group_moments)
+    cohens_d = njit(cache=True, error_model='numpy')(_cohens_d_fused)
+else:
+    cohens_d = _cohens_d_numpy
@@ -0,0 +1,112 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Callable, List, Dict, Optional, Tuple
+from openai import DEFAULT_CONNECTION_LIMITS, DefaultHttpxClient, OpenAI
+
+GROQ_BASE_URL = "https://api.groq.com/openai/v1"
+
+# On-disk cache for deterministic (temperature=0) completions
+LLM_CACHE_DIR = Path(os.getenv("ADM_LLM_CACHE", "~/.adm/llm_cache")).expanduser()
+LLM_CACHE_TTL = 86400  # seconds
+
+
+@lru_cache(maxsize=1)
+def get_groq_client() -> OpenAI:
+    """
+    Returns a process-wide Groq client.
+    Sharing one client keeps a single keep-alive connection pool across agents,
+    so each task does not pay a fresh TLS handshake.
+    """
+    api_key = os.getenv("GROQ_API_KEY", "your-api-key-here")
+    return OpenAI(
+        api_key=api_key,
+        base_url=GROQ_BASE_URL,
+        # Limits built from the SDK's own type, so this works whichever httpx build it uses
+        http_client=DefaultHttpxClient(
+            limits=type(DEFAULT_CONNECTION_LIMITS)(max_keepalive_connections=16, max_connections=32),
+            timeout=30.0
+        )
+    )
+
+
+def stream_completion(client: OpenAI, model: str, messages: List[Dict[str, str]], temperature: float,
+                      max_tokens: Optional[int] = None, stop: Optional[List[str]] = None) -> str:
+    """
+    Streams a chat completion and returns the concatenated message text.
+    """
+    text, _ = stream_completion_until(client, model, messages, temperature, None,
+                                      max_tokens=max_tokens, stop=stop)
+    return text
+
+
+def stream_completion_until(client: OpenAI, model: str, messages: List[Dict[str, str]], temperature: float,
+                            until: Optional[Callable[[str], Any]], max_tokens: Optional[int] = None,
+                            stop: Optional[List[str]] = None) -> Tuple[str, bool]:
+    """
+    Like stream_completion, but `until` (if given) is called with the text so far
+    after every chunk; once it returns a truthy value the stream is closed.
+    Returns (text, stopped_early); with stopped_early the text is only a prefix.
+    """
+    kwargs = {}
+    if max_tokens is not None:
+        kwargs["max_tokens"] = max_tokens
+    if stop is not None:
+        kwargs["stop"] = stop
+    
+    stream = client.chat.completions.create(
+        model=model,
+        messages=messages,
+        temperature=temperature,
+        stream=True,
+        **kwargs
+    )
+    text = ""
+    for chunk in stream:
+        if chunk.choices and chunk.choices[0].delta.content:
+            text += chunk.choices[0].delta.content
+            if until is not None and until(text):
+                stream.close()  # Stop generation (and billing) early
+                return text, True
+    return text, False
+
+
+def completion_cache_key(model: str, system_prompt: str, user_prompt: str,
+                         max_tokens: Optional[int] = None, stop: Optional[List[str]] = None) -> str:
+    """
+    Hashes everything that shapes a deterministic completion into a cache key.
+    """
+    # JSON keeps the fields unambiguous, whatever characters the prompts contain
+    payload = json.dumps([model, system_prompt, user_prompt, max_tokens, stop])
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def cache_get(key: str) -> Optional[str]:
+    """
+    Returns a cached completion, or None if missing or older than LLM_CACHE_TTL.
+    """
+    path = LLM_CACHE_DIR / key
+    try:
+        if time.time() - path.stat().st_mtime > LLM_CACHE_TTL:
+            return None
+        return path.read_text(encoding="utf-8")
+    except OSError:
+        return None
+
+
+def cache_set(key: str, value: str):
+    """
+    Stores a completion. Writes go through a temp file so concurrent readers
+    never see a partial entry.
+    """
+    try:
+        LLM_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        tmp_path = LLM_CACHE_DIR / f"{key}.{os.getpid()}.{threading.get_ident()}.tmp"
+        tmp_path.write_text(value, encoding="utf-8")
+        os.replace(tmp_path, LLM_CACHE_DIR / key)
+    except OSError as e:
+        print(f"[LLM] Cache write failed: {e}")
@@ -1,10 +1,26 @@
+import socket
 import threading
 import time
 from sprint.server import run_server
 from scalable_agent.agent import LifelongAgent
 
+SERVER_PORT = 8081 # Use different port to avoid conflict
+
 def start_server():
-    run_server(port=8081) # Use different port to avoid conflict
+    run_server(port=SERVER_PORT)
+
+def wait_for_server(port: int, timeout: float = 5.0) -> bool:
+    """
+    Polls until the server accepts connections instead of sleeping a fixed time.
+    """
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            with socket.create_connection(("localhost", port), timeout=0.1):
+                return True
+        except OSError:
+            time.sleep(0.02)
+    return False
 
 def main():
     print("Starting Phase 5: Scalable Architecture Prototype...")
@@ -12,7 +28,8 @@ def main():
     # 1. Start Server
     server_thread = threading.Thread(target=start_server, daemon=True)
     server_thread.start()
-    time.sleep(1)
+    if not wait_for_server(SERVER_PORT):
+        print(f"Warning: server on port {SERVER_PORT} not reachable yet")
     
     # 2. Initialize Agent
     agent = LifelongAgent()
@@ -1,6 +1,10 @@
+from concurrent.futures import ThreadPoolExecutor
 from typing import List, Dict, Any
 from .vector_store import VectorStore
 
+# Semantic and episodic searches hit different collections, so they can overlap
+_POOL = ThreadPoolExecutor(max_workers=2, thread_name_prefix="retrieval")
+
 class HybridRetriever:
     def __init__(self, vector_store: VectorStore):
         self.store = vector_store
@@ -13,12 +17,18 @@ class HybridRetriever:
         3. Rule Retrieval: Always fetch relevant semantic rules.
         """
         
+        # Embed the query once and search both memories with the same vector
+        query_embedding = self.store.embed(query)
+        
         # 1. Retrieve Rules (Semantic Memory) - High Priority
-        rules = self.store.query_semantic(query, n_results=2)
+        rules_future = _POOL.submit(self.store.query_semantic, query, n_results=2,
+                                    query_embedding=query_embedding)
         
-        # 2. Retrieve Episodes (Episodic Memory)
+        # 2. Retrieve Episodes (Episodic Memory) on this thread while the rules search runs
         where_filter = {"error_type": error_type} if error_type else None
-        episodes = self.store.query_episodic(query, n_results=3, where=where_filter)
+        episodes = self.store.query_episodic(query, n_results=3, where=where_filter,
+                                             query_embedding=query_embedding)
+        rules = rules_future.result()
         
         # 3. Format Context
         context_parts = []
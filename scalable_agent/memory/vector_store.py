@@ -1,102 +1,435 @@
-import chromadb
-from chromadb.config import Settings
-import uuid
+import itertools
+import secrets
+import threading
 import os
-from typing import List, Dict, Any, Optional
+import weakref
+from abc import ABC, abstractmethod
+from functools import lru_cache, partial
+import numpy as np
+from typing import List, Dict, Any, Optional, Tuple
 
-class VectorStore:
-    def __init__(self, persist_path: str = "chroma_db"):
-        """
-        Initialize ChromaDB client with sentence-transformers embedding.
-        This avoids the onnxruntime dependency issue.
-        """
-        self.client = chromadb.PersistentClient(path=persist_path)
-        
-        # Use sentence-transformers embedding function (more reliable)
-        from chromadb.utils import embedding_functions
-        sentence_transformer_ef = embedding_functions.SentenceTransformerEmbeddingFunction(
-            model_name="all-MiniLM-L6-v2"
-        )
-        
-        # Create or get collections with explicit embedding function
-        self.episodic = self.client.get_or_create_collection(
-            name="episodic_memory",
-            embedding_function=sentence_transformer_ef
-        )
-        self.semantic = self.client.get_or_create_collection(
-            name="semantic_memory",
-            embedding_function=sentence_transformer_ef
-        )
-        
-        print(f"[VectorStore] Initialized at {persist_path}")
+FLUSH_SIZE = 32  # Pending writes that trigger one batched embedding pass
+EMBED_CACHE_SIZE = 1024  # Query embeddings kept per store; benchmark prompts repeat
+QUERY_BLOCK_ROWS = 4096  # int8 rows widened to float32 at a time when scoring a query
+
+# Record IDs: a random per-process prefix keeps them unique across runs sharing a
+# database, and a counter makes each one without another urandom read
+_ID_PREFIX = secrets.token_hex(8)
+_ID_COUNTER = itertools.count()
+
+
+def _next_id() -> str:
+    return f"{_ID_PREFIX}{next(_ID_COUNTER):x}"
+
+
+def _embed_readonly(embed_text: weakref.WeakMethod, text: str) -> np.ndarray:
+    embedding = embed_text()(text)
+    embedding.setflags(write=False)
+    return embedding
+
+
+class _BufferedWrites(ABC):
+    """
+    Buffers add_episode/add_rule calls so documents are embedded in batches.
+    Pending writes are flushed when `flush_size` is reached, before any query,
+    and on explicit flush() (e.g. before the agent sleeps).
+    Query embeddings from embed() are memoized, since prompts recur across tasks.
+    """
+    flush_size = FLUSH_SIZE
+
+    def __init__(self):
+        self._pending_episodes: List[Tuple[str, Dict[str, Any]]] = []
+        self._pending_rules: List[Tuple[str, Dict[str, Any]]] = []
+        # Queries flush from worker threads (e.g. the Dreamer) while writes arrive
+        self._write_lock = threading.RLock()
+        # Bumped on every FAILURE episode, so the Dreamer can skip idle sleep cycles
+        self.failure_seq = 0
+        # Holds the store only weakly, so the cache does not form a reference cycle
+        self._embed_cached = lru_cache(maxsize=EMBED_CACHE_SIZE)(
+            partial(_embed_readonly, weakref.WeakMethod(self._embed_text)))
 
     def add_episode(self, text: str, metadata: Dict[str, Any]):
         """
         Stores a raw episode trace.
         """
-        self.episodic.add(
-            documents=[text],
-            metadatas=[metadata],
-            ids=[str(uuid.uuid4())]
-        )
+        with self._write_lock:
+            if metadata.get("outcome") == "FAILURE":
+                self.failure_seq += 1
+            self._pending_episodes.append((text, metadata))
+            if len(self._pending_episodes) >= self.flush_size:
+                self.flush()
 
     def add_rule(self, rule: str, metadata: Dict[str, Any]):
         """
         Stores a consolidated rule.
         """
+        with self._write_lock:
+            self._pending_rules.append((rule, metadata))
+            if len(self._pending_rules) >= self.flush_size:
+                self.flush()
+
+    def add_episodes(self, texts: List[str], metadatas: List[Dict[str, Any]]):
+        """
+        Stores several episode traces at once; they (and anything pending) are
+        embedded in one batch right away.
+        """
+        with self._write_lock:
+            self.failure_seq += sum(1 for metadata in metadatas if metadata.get("outcome") == "FAILURE")
+            self._pending_episodes.extend(zip(texts, metadatas))
+            self.flush()
+
+    def add_rules(self, rules: List[str], metadatas: List[Dict[str, Any]]):
+        """
+        Stores several consolidated rules at once, embedded in one batch right away.
+        """
+        with self._write_lock:
+            self._pending_rules.extend(zip(rules, metadatas))
+            self.flush()
+
+    def flush(self):
+        """
+        Writes all pending episodes and rules.
+        """
+        with self._write_lock:
+            if self._pending_episodes:
+                texts, metadatas = zip(*self._pending_episodes)
+                self._pending_episodes = []
+                self._write_episodes(list(texts), list(metadatas))
+            if self._pending_rules:
+                rules, metadatas = zip(*self._pending_rules)
+                self._pending_rules = []
+                self._write_rules(list(rules), list(metadatas))
+
+    def _discard_pending(self):
+        with self._write_lock:
+            self._pending_episodes = []
+            self._pending_rules = []
+
+    def embed(self, text: str) -> np.ndarray:
+        """
+        Embeds `text` with the same model the stored documents use.
+        Repeat texts are served from a bounded cache; the returned array is read-only.
+        """
+        return self._embed_cached(text)
+
+    def embed_cache_info(self):
+        """
+        Hits/misses of the embed() cache, as functools.lru_cache reports them.
+        """
+        return self._embed_cached.cache_info()
+
+    @abstractmethod
+    def _embed_text(self, text: str) -> np.ndarray:
+        ...
+
+    @abstractmethod
+    def _write_episodes(self, texts: List[str], metadatas: List[Dict[str, Any]]):
+        ...
+
+    @abstractmethod
+    def _write_rules(self, rules: List[str], metadatas: List[Dict[str, Any]]):
+        ...
+
+
+@lru_cache(maxsize=None)
+def _persistent_client(path: str):
+    """One Chroma client per database path, shared by every VectorStore on it."""
+    import chromadb
+    return chromadb.PersistentClient(path=path)
+
+
+class VectorStore(_BufferedWrites):
+    # Unbuffered: every add reaches Chroma before returning, so no write is lost
+    # if the store is dropped or the process dies; add_episodes/add_rules still batch
+    flush_size = 1
+
+    def __init__(self, persist_path: str = "chroma_db"):
+        """
+        ChromaDB-backed store with sentence-transformers embedding.
+        This avoids the onnxruntime dependency issue.
+        chromadb, the client and the embedding model are only loaded on first use.
+        """
+        super().__init__()
+        self.persist_path = persist_path
+        self._client = None
+        self._embedding_function = None
+        self._episodic = None
+        self._semantic = None
+        self._connect_lock = threading.Lock()
+
+    def _connect(self):
+        """
+        Opens the client and both collections, once.
+        """
+        with self._connect_lock:
+            if self._client is not None:
+                return
+            client = _persistent_client(os.path.abspath(self.persist_path))
+            
+            # Use sentence-transformers embedding function (more reliable)
+            from chromadb.utils import embedding_functions
+            sentence_transformer_ef = embedding_functions.SentenceTransformerEmbeddingFunction(
+                model_name="all-MiniLM-L6-v2"
+            )
+            
+            # Create or get collections with explicit embedding function
+            self._episodic = client.get_or_create_collection(
+                name="episodic_memory",
+                embedding_function=sentence_transformer_ef
+            )
+            self._semantic = client.get_or_create_collection(
+                name="semantic_memory",
+                embedding_function=sentence_transformer_ef
+            )
+            self._embedding_function = sentence_transformer_ef
+            self._client = client
+            
+            print(f"[VectorStore] Initialized at {self.persist_path}")
+
+    @property
+    def client(self):
+        self._connect()
+        return self._client
+
+    @property
+    def embedding_function(self):
+        self._connect()
+        return self._embedding_function
+
+    @property
+    def episodic(self):
+        self._connect()
+        return self._episodic
+
+    @property
+    def semantic(self):
+        self._connect()
+        return self._semantic
+
+    def _write_episodes(self, texts: List[str], metadatas: List[Dict[str, Any]]):
+        # One add call lets Chroma embed the whole batch in a single forward pass
+        self.episodic.add(
+            documents=texts,
+            metadatas=metadatas,
+            ids=[_next_id() for _ in texts]
+        )
+
+    def _write_rules(self, rules: List[str], metadatas: List[Dict[str, Any]]):
         self.semantic.add(
-            documents=[rule],
-            metadatas=[metadata],
-            ids=[str(uuid.uuid4())]
+            documents=rules,
+            metadatas=metadatas,
+            ids=[_next_id() for _ in rules]
         )
 
-    def query_episodic(self, query: str, n_results: int = 3, where: Optional[Dict] = None) -> List[Dict]:
+    def query_episodic(self, query: str, n_results: int = 3, where: Optional[Dict] = None,
+                       query_embedding: Optional[np.ndarray] = None) -> List[Dict]:
         """
         Searches episodic memory.
         Returns results with embeddings for clustering.
+        Pass `query_embedding` (see embed()) to search with a vector that is already computed.
         """
+        self.flush()
         results = self.episodic.query(
-            query_texts=[query],
+            **self._query_args(query, query_embedding),
             n_results=n_results,
             where=where,
             include=["documents", "metadatas", "distances", "embeddings"]
         )
         return self._format_results(results)
 
-    def query_semantic(self, query: str, n_results: int = 3) -> List[Dict]:
+    def query_semantic(self, query: str, n_results: int = 3, query_embedding: Optional[np.ndarray] = None) -> List[Dict]:
         """
         Searches semantic memory (rules).
+        Pass `query_embedding` (see embed()) to search with a vector that is already computed.
         """
+        self.flush()
         results = self.semantic.query(
-            query_texts=[query],
+            **self._query_args(query, query_embedding),
             n_results=n_results,
-            include=["documents", "metadatas", "distances"]
+            include=["documents", "metadatas", "distances", "embeddings"]
         )
         return self._format_results(results)
+
+    @staticmethod
+    def _query_args(query: str, query_embedding: Optional[np.ndarray]) -> Dict[str, Any]:
+        # A precomputed embedding spares Chroma from embedding the query text again
+        if query_embedding is not None:
+            return {"query_embeddings": [np.asarray(query_embedding, dtype=np.float32).tolist()]}
+        return {"query_texts": [query]}
+
+    def _embed_text(self, text: str) -> np.ndarray:
+        return np.array(self.embedding_function([text])[0], dtype=np.float32)
     
     def _format_results(self, results) -> List[Dict]:
         """
         Helper to format ChromaDB results into a clean list of dicts.
         Includes embeddings for clustering.
         """
-        formatted = []
         if not results['documents']:
             return []
-            
-        for i in range(len(results['documents'][0])):
-            formatted.append({
-                "content": results['documents'][0][i],
-                "metadata": results['metadatas'][0][i],
-                "distance": results['distances'][0][i] if results['distances'] else None,
-                "embedding": results['embeddings'][0][i] if results.get('embeddings') else None
-            })
-        return formatted
+        
+        # Pull each column out once; absent ones become a run of None
+        docs = results['documents'][0]
+        missing = [None] * len(docs)
+        distances = results.get('distances')
+        embeddings = results.get('embeddings')
+        distances = distances[0] if distances is not None and len(distances) else missing
+        embeddings = embeddings[0] if embeddings is not None and len(embeddings) else missing
+        
+        return [
+            {"content": doc, "metadata": meta, "distance": dist, "embedding": emb}
+            for doc, meta, dist, emb in zip(docs, results['metadatas'][0], distances, embeddings)
+        ]
 
-    def clear(self):
+    def clear(self, hard: bool = False):
         """
         Resets the database (for testing).
+        Deletes every record but keeps the opened collections; hard=True drops and
+        recreates the collections instead.
+        """
+        self._discard_pending()
+        if hard:
+            self.client.delete_collection("episodic_memory")
+            self.client.delete_collection("semantic_memory")
+            self._episodic = self.client.get_or_create_collection(
+                name="episodic_memory",
+                embedding_function=self.embedding_function
+            )
+            self._semantic = self.client.get_or_create_collection(
+                name="semantic_memory",
+                embedding_function=self.embedding_function
+            )
+            return
+        
+        for collection in (self.episodic, self.semantic):
+            ids = collection.get(include=[])['ids']
+            if ids:
+                collection.delete(ids=ids)
+
+
+@lru_cache(maxsize=None)
+def _load_sentence_transformer(model_name: str):
+    """Load each embedding model once per process; in-memory stores share it."""
+    from sentence_transformers import SentenceTransformer
+    return SentenceTransformer(model_name)
+
+
+class _InMemoryCollection:
+    """
+    Documents, metadatas and int8-quantized unit embeddings for one memory store.
+    Each row keeps its own float32 scale, so row i is approximately codes[i] * scales[i].
+    """
+    def __init__(self, dim: int):
+        self.dim = dim
+        self.documents: List[str] = []
+        self.metadatas: List[Dict[str, Any]] = []
+        self.codes = np.empty((0, dim), dtype=np.int8)
+        self.scales = np.empty(0, dtype=np.float32)
+
+    def add(self, documents: List[str], metadatas: List[Dict[str, Any]], embeddings: np.ndarray):
+        scales = np.abs(embeddings).max(axis=1) / 127.0
+        scales[scales == 0] = 1.0
+        codes = np.clip(np.round(embeddings / scales[:, None]), -128, 127).astype(np.int8)
+        
+        self.documents.extend(documents)
+        self.metadatas.extend(metadatas)
+        self.codes = np.vstack([self.codes, codes])
+        self.scales = np.concatenate([self.scales, scales.astype(np.float32)])
+
+    def query(self, embedding: np.ndarray, n_results: int, where: Optional[Dict] = None) -> List[Dict]:
+        if where:
+            candidates = np.array([i for i in range(len(self.documents))
+                                   if all(self.metadatas[i].get(k) == v for k, v in where.items())], dtype=np.intp)
+            codes, scales = self.codes[candidates], self.scales[candidates]
+        else:
+            candidates = np.arange(len(self.documents))
+            codes, scales = self.codes, self.scales
+        if candidates.size == 0:
+            return []
+        
+        # Inner product of unit vectors == cosine similarity. Scoring works on the
+        # int8 codes a block at a time and applies the row scales afterwards, so
+        # only the returned rows are ever dequantized in full
+        sims = np.empty(candidates.size, dtype=np.float32)
+        for start in range(0, candidates.size, QUERY_BLOCK_ROWS):
+            sims[start:start + QUERY_BLOCK_ROWS] = codes[start:start + QUERY_BLOCK_ROWS] @ embedding
+        sims *= scales
+        
+        k = min(n_results, candidates.size)
+        top = np.argpartition(-sims, k - 1)[:k]
+        top = top[np.argsort(-sims[top])]
+        vectors = codes[top].astype(np.float32) * scales[top, None]
+        return [{
+            "content": self.documents[candidates[i]],
+            "metadata": self.metadatas[candidates[i]],
+            "distance": float(1.0 - sims[i]),
+            "embedding": vector
+        } for i, vector in zip(top, vectors)]
+
+
+class InMemoryVectorStore(_BufferedWrites):
+    """
+    In-process dual store with the same interface as VectorStore.
+    Embeddings live in NumPy matrices and nearest neighbours are found with one
+    matrix-vector product, so there is no SQLite/disk round-trip per add or query.
+    Nothing is persisted; use it for throwaway runs such as ablation variants.
+    """
+    def __init__(self, model_name: str = "all-MiniLM-L6-v2", dim: int = 384):
+        super().__init__()
+        self.model_name = model_name
+        self.dim = dim
+        self._model = None
+        self.episodic = _InMemoryCollection(dim)
+        self.semantic = _InMemoryCollection(dim)
+        print("[VectorStore] Initialized in memory")
+
+    @property
+    def model(self):
+        if self._model is None:
+            self._model = _load_sentence_transformer(self.model_name)
+        return self._model
+
+    def _encode(self, texts: List[str]) -> np.ndarray:
+        return self.model.encode(texts, batch_size=FLUSH_SIZE, convert_to_numpy=True,
+                                 normalize_embeddings=True).astype(np.float32)
+
+    def _write_episodes(self, texts: List[str], metadatas: List[Dict[str, Any]]):
+        self.episodic.add(texts, metadatas, self._encode(texts))
+
+    def _write_rules(self, rules: List[str], metadatas: List[Dict[str, Any]]):
+        self.semantic.add(rules, metadatas, self._encode(rules))
+
+    def query_episodic(self, query: str, n_results: int = 3, where: Optional[Dict] = None,
+                       query_embedding: Optional[np.ndarray] = None) -> List[Dict]:
+        """
+        Searches episodic memory. Only equality filters are supported in `where`.
+        Returns results with embeddings for clustering.
+        Pass `query_embedding` (see embed()) to search with a vector that is already computed.
+        """
+        self.flush()
+        if query_embedding is None:
+            query_embedding = self.embed(query)
+        return self.episodic.query(np.asarray(query_embedding, dtype=np.float32), n_results, where)
+
+    def query_semantic(self, query: str, n_results: int = 3, query_embedding: Optional[np.ndarray] = None) -> List[Dict]:
+        """
+        Searches semantic memory (rules).
+        Pass `query_embedding` (see embed()) to search with a vector that is already computed.
+        """
+        self.flush()
+        if query_embedding is None:
+            query_embedding = self.embed(query)
+        return self.semantic.query(np.asarray(query_embedding, dtype=np.float32), n_results)
+
+    def _embed_text(self, text: str) -> np.ndarray:
+        # Unit float32 vector, like the stored embeddings
+        return self._encode([text])[0]
+
+    def clear(self, hard: bool = False):
+        """
+        Resets both stores. `hard` is accepted for parity with VectorStore;
+        an in-memory reset is always complete.
         """
-        self.client.delete_collection("episodic_memory")
-        self.client.delete_collection("semantic_memory")
-        self.episodic = self.client.get_or_create_collection(name="episodic_memory")
-        self.semantic = self.client.get_or_create_collection(name="semantic_memory")
+        self._discard_pending()
+        self.episodic = _InMemoryCollection(self.dim)
+        self.semantic = _InMemoryCollection(self.dim)